@@ -125,6 +125,14 @@ def add_global_identity_args(parser):
         help=_('A string token to bootstrap the Keystone database, defaults '
                'to env[OS_TOKEN]'))
 
+    parser.add_argument(
+        '--os-token-cache', dest='token_cache', action='store_true',
+        default=bool(utils.env('OS_TOKEN_CACHE')),
+        help=_('Cache the authentication token on disk and reuse it until '
+               'it expires, defaults to env[OS_TOKEN_CACHE]. The cache is '
+               'kept in env[SENLINCLIENT_CACHE_DIR] or '
+               '~/.cache/senlinclient.'))
+
     parser.add_argument(
         '--os-access-info', dest='access_info', metavar='ACCESS_INFO',
         default=utils.env('OS_ACCESS_INFO'),
@@ -191,10 +199,44 @@ def add_global_args(parser, version):
         help=_("Print more verbose output."))
 
     parser.add_argument(
-        '--api-timeout',
+        '--api-timeout', type=float,
         help=_('Number of seconds to wait for an API response, '
                'defaults to system socket timeout'))
 
+    parser.add_argument(
+        '--senlin-url', metavar='<URL>',
+        default=utils.env('SENLIN_URL'),
+        help=_('Senlin API endpoint to use instead of the one found in the '
+               'service catalog, defaults to env[SENLIN_URL].'))
+
+    parser.add_argument(
+        '--name-cache', action='store_true',
+        default=bool(utils.env('SENLINCLIENT_NAME_CACHE')),
+        help=_('Remember the IDs of resources referred to by name on disk, '
+               'so that later commands do not look them up again, defaults '
+               'to env[SENLINCLIENT_NAME_CACHE].'))
+
+    parser.add_argument(
+        '--http-cache', action='store_true',
+        default=bool(utils.env('SENLINCLIENT_HTTP_CACHE')),
+        help=_('Keep the objects shown on disk and only download them again '
+               'when the server reports they have changed, defaults to '
+               'env[SENLINCLIENT_HTTP_CACHE].'))
+
+    parser.add_argument(
+        '--timings', action='store_true',
+        default=bool(utils.env('SENLINCLIENT_TIMINGS')),
+        help=_('Print the time spent in each phase of the command and in '
+               'each HTTP request to stderr on exit, defaults to '
+               'env[SENLINCLIENT_TIMINGS].'))
+
+    parser.add_argument(
+        '--timings-file', metavar='<FILE>',
+        default=utils.env('SENLINCLIENT_TIMINGS_FILE'),
+        help=_('Record the same timings as --timings and save them as JSON '
+               'to this file on exit, defaults to '
+               'env[SENLINCLIENT_TIMINGS_FILE].'))
+
     parser.add_argument(
         '--senlin-api-version',
         default=utils.env('SENLIN_API_VERSION', default='1'),
@@ -21,4 +21,4 @@ def Client(api_ver, session, **kwargs):
     '''
     module = utils.import_versioned_module(api_ver, 'client')
     cls = getattr(module, 'Client')
-    return cls(session)
+    return cls(session, **kwargs)
@@ -0,0 +1,249 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+'''
+Minimal HTTP/1.1 client on asyncio streams, requires Python 3.5 or later.
+
+Requests are sent on connections opened by :func:`asyncio.open_connection`
+and kept alive per host, so any number of them can wait for their response
+in the thread running the event loop.
+'''
+
+import asyncio
+import ssl
+from urllib import parse
+
+from senlinclient.common import serialization
+
+
+class Response(object):
+    '''A response whose body has been read.
+
+    :ivar status_code: The status code, e.g. 200.
+    :ivar reason: The reason phrase, e.g. 'OK'.
+    :ivar headers: A dict of the headers, keyed by lowercase name.
+    :ivar content: The body, as bytes.
+    :ivar bytes_sent: The size of the body of the request.
+    '''
+
+    def __init__(self, status_code, reason, headers, content):
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+        self.bytes_sent = 0
+
+    def json(self):
+        '''Decode the body as JSON, None if it is empty.'''
+        if not self.content:
+            return None
+        return serialization.loads(self.content)
+
+
+class StaleConnection(Exception):
+    '''A kept alive connection was closed by the server before replying.'''
+
+
+def _ssl_context(verify):
+    context = ssl.create_default_context(
+        cafile=verify if isinstance(verify, str) else None)
+    if verify is False:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+class HTTPClient(object):
+    '''Send HTTP requests on connections kept alive per host.
+
+    :param max_connections: Maximum number of connections per host, the
+                            requests beyond wait for a connection to be
+                            free.
+    :param timeout: Seconds to wait for each response, None means waiting
+                    forever. :class:`asyncio.TimeoutError` is raised when
+                    it is exceeded.
+    :param verify: Whether to verify the certificates of HTTPS servers, or
+                   the path of the CA bundle to verify them with.
+    :param user_agent: Value of the User-Agent header.
+    '''
+
+    def __init__(self, max_connections=10, timeout=None, verify=True,
+                 user_agent=None):
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.verify = verify
+        self.user_agent = user_agent
+        self._ssl = None
+        # Idle connections and semaphores limiting the requests in flight,
+        # by (scheme, host, port)
+        self._idle = {}
+        self._slots = {}
+
+    async def request(self, method, url, params=None, headers=None,
+                      json=None):
+        '''Send a request, return its :class:`Response`.
+
+        :param params: A dict of query parameters, parameters whose value is
+                       None are left out and list values are repeated.
+        :param json: An object sent as the JSON body of the request.
+        '''
+        parts = parse.urlsplit(url)
+        https = parts.scheme == 'https'
+        key = (parts.scheme, parts.hostname,
+               parts.port or (443 if https else 80))
+
+        target = parts.path or '/'
+        query = [parts.query] if parts.query else []
+        if params:
+            query.append(parse.urlencode(
+                [(k, v) for k, v in params.items() if v is not None],
+                doseq=True))
+        query = '&'.join(q for q in query if q)
+        if query:
+            target += '?' + query
+
+        body = b''
+        if json is not None:
+            body = serialization.dumps(json).encode('utf-8')
+        fields = {'Host': parts.netloc, 'Accept': 'application/json'}
+        if self.user_agent:
+            fields['User-Agent'] = self.user_agent
+        if json is not None:
+            fields['Content-Type'] = 'application/json'
+        if body or method in ('POST', 'PUT', 'PATCH'):
+            fields['Content-Length'] = str(len(body))
+        fields.update(headers or {})
+        head = ['%s %s HTTP/1.1' % (method, target)]
+        head.extend('%s: %s' % item for item in fields.items())
+        data = ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body
+
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = asyncio.Semaphore(self.max_connections)
+        async with slot:
+            exchange = self._exchange(key, https, method, data)
+            if self.timeout is None:
+                resp = await exchange
+            else:
+                resp = await asyncio.wait_for(exchange, self.timeout)
+        resp.bytes_sent = len(body)
+        return resp
+
+    async def _exchange(self, key, https, method, data):
+        while True:
+            reader, writer, reused = await self._connect(key, https)
+            try:
+                resp, keep_alive = await self._send(reader, writer, method,
+                                                    data, reused)
+            except StaleConnection:
+                # Only raised for reused connections, the next attempt is
+                # on another idle connection or on a new one
+                writer.close()
+                continue
+            except BaseException:
+                # The connection is in an unknown state, e.g. cancelled
+                # while reading the response
+                writer.close()
+                raise
+
+            if keep_alive:
+                self._idle.setdefault(key, []).append((reader, writer))
+            else:
+                writer.close()
+            return resp
+
+    async def _connect(self, key, https):
+        idle = self._idle.get(key)
+        while idle:
+            reader, writer = idle.pop()
+            if not writer.transport.is_closing() and not reader.at_eof():
+                return reader, writer, True
+            writer.close()
+
+        context = None
+        if https:
+            if self._ssl is None:
+                self._ssl = _ssl_context(self.verify)
+            context = self._ssl
+        reader, writer = await asyncio.open_connection(key[1], key[2],
+                                                       ssl=context)
+        return reader, writer, False
+
+    async def _send(self, reader, writer, method, data, reused):
+        try:
+            writer.write(data)
+            await writer.drain()
+            line = await reader.readline()
+        except ConnectionError:
+            if reused:
+                raise StaleConnection()
+            raise
+        if not line:
+            if reused:
+                raise StaleConnection()
+            raise ConnectionResetError('Connection closed by the server')
+
+        status = line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+        version, code = status[0], int(status[1])
+        reason = status[2] if len(status) > 2 else ''
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _sep, value = line.decode('latin-1').partition(':')
+            name = name.strip().lower()
+            value = value.strip()
+            headers[name] = ('%s, %s' % (headers[name], value)
+                             if name in headers else value)
+
+        keep_alive = (version == 'HTTP/1.1' and
+                      headers.get('connection', '').lower() != 'close')
+        if method == 'HEAD' or code in (204, 304) or code < 200:
+            content = b''
+        elif 'chunked' in headers.get('transfer-encoding', '').lower():
+            content = await self._read_chunked(reader)
+        elif 'content-length' in headers:
+            content = await reader.readexactly(
+                int(headers['content-length']))
+        else:
+            # The body ends with the connection
+            content = await reader.read()
+            keep_alive = False
+        return Response(code, reason, headers, content), keep_alive
+
+    @staticmethod
+    async def _read_chunked(reader):
+        chunks = []
+        while True:
+            line = await reader.readline()
+            size = int(line.split(b';')[0].strip() or b'0', 16)
+            if not size:
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+        # Trailers
+        while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+            pass
+        return b''.join(chunks)
+
+    def close(self):
+        '''Close the idle connections.'''
+        for connections in self._idle.values():
+            for reader, writer in connections:
+                try:
+                    writer.close()
+                except RuntimeError:
+                    # The event loop is closed, and the connection with it
+                    pass
+        self._idle = {}
@@ -0,0 +1,359 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+'''
+Client side caches persisted on disk across invocations of the CLI.
+'''
+
+import hashlib
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+
+from oslo_utils import importutils
+
+from senlinclient.common import utils
+
+fcntl = importutils.try_import('fcntl')
+LOG = logging.getLogger(__name__)
+
+
+def cache_dir():
+    '''Return the directory where cache files are kept.'''
+    default = os.path.join(os.path.expanduser('~'), '.cache', 'senlinclient')
+    return utils.env('SENLINCLIENT_CACHE_DIR', default=default)
+
+
+def makedirs(path):
+    '''Create a directory and its missing parents, only usable by the owner.
+
+    Unlike :func:`os.makedirs`, the mode is given to every directory created,
+    not only to the last one.
+    '''
+    if not path or os.path.isdir(path):
+        return
+    makedirs(os.path.dirname(path))
+    try:
+        os.mkdir(path, 0o700)
+    except OSError:
+        # Created by another process in the meantime
+        if not os.path.isdir(path):
+            raise
+
+
+class FileLock(object):
+    '''An exclusive advisory lock on a file.
+
+    Locking is skipped on platforms that don't have fcntl.
+    '''
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+
+    def __enter__(self):
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if fcntl:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if fcntl:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+        self.fd = None
+
+
+class JSONFileCache(object):
+    '''A dict of records kept in a JSON file only readable by its owner.
+
+    All reads and writes are done while holding a lock on a companion lock
+    file, so that concurrent processes don't corrupt the cache.
+    '''
+    def __init__(self, path):
+        self.path = path
+
+    def _ensure_dir(self):
+        makedirs(os.path.dirname(self.path))
+
+    def lock(self):
+        self._ensure_dir()
+        return FileLock(self.path + '.lock')
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.loads(f.read())
+        except (IOError, OSError, ValueError) as ex:
+            LOG.debug('Cache file %(path)s not loaded: %(ex)s',
+                      {'path': self.path, 'ex': ex})
+            return {}
+
+    def save(self, records):
+        tmp_path = '%s.%s.tmp' % (self.path, os.getpid())
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            f.write(json.dumps(records))
+        os.rename(tmp_path, self.path)
+
+
+class TokenCache(object):
+    '''An on-disk cache of Keystone tokens and their service catalogs.
+
+    Entries are keyed by the identity arguments used for authentication and
+    are evicted once the token is about to expire.
+    '''
+
+    #: Treat a token as expired if it expires within this many seconds
+    BEST_BEFORE_SECONDS = 60
+
+    def __init__(self, path=None):
+        path = path or os.path.join(cache_dir(), 'tokens.json')
+        self.store = JSONFileCache(path)
+
+    @staticmethod
+    def make_key(**kwargs):
+        '''Build a cache key out of the identity arguments.
+
+        Arguments that are not set are ignored. Secrets such as the password
+        should not be passed in.
+        '''
+        items = sorted((k, v) for k, v in kwargs.items() if v)
+        return hashlib.sha256(json.dumps(items).encode('utf-8')).hexdigest()
+
+    def _expired(self, info):
+        from openstack.auth import access
+
+        try:
+            access_info = access.AccessInfo.factory(**info)
+            return access_info.will_expire_soon(self.BEST_BEFORE_SECONDS)
+        except Exception:
+            # Something we cannot interpret, don't keep it
+            return True
+
+    def get(self, key):
+        '''Return the access info cached for the key, or None.'''
+        with self.store.lock():
+            records = self.store.load()
+            expired = [k for k, v in records.items() if self._expired(v)]
+            for k in expired:
+                del records[k]
+            if expired:
+                self.store.save(records)
+        return records.get(key)
+
+    def put(self, key, info):
+        '''Cache the raw access info returned from authentication.'''
+        with self.store.lock():
+            records = self.store.load()
+            records[key] = info
+            self.store.save(records)
+
+    def delete(self, key):
+        '''Drop the entry for the key, e.g. when its token is rejected.'''
+        with self.store.lock():
+            records = self.store.load()
+            if records.pop(key, None) is not None:
+                self.store.save(records)
+
+
+class NameCache(object):
+    '''A cache mapping resource names to IDs.
+
+    Entries are kept in memory in least recently used order and expire after
+    `ttl` seconds. When a path is given, the entries are also shared with
+    other processes through a file.
+    '''
+
+    #: Number of seconds a name is assumed to keep referring to the same ID
+    DEFAULT_TTL = 300
+    #: Maximum number of names remembered
+    DEFAULT_SIZE = 1000
+
+    def __init__(self, ttl=DEFAULT_TTL, size=DEFAULT_SIZE, path=None):
+        self.ttl = ttl
+        self.size = size
+        self.store = JSONFileCache(path) if path else None
+        self.records = {}
+        # Ticks of the last use of each entry, collections.OrderedDict is not
+        # available on Python 2.6
+        self._used = {}
+        self._ticks = itertools.count()
+        self._mutex = threading.Lock()
+        self._loaded = False
+
+    @staticmethod
+    def make_key(resource_type, project, name):
+        return '/'.join((resource_type, project, name))
+
+    def _load(self):
+        if self.store is None or self._loaded:
+            return
+        self._loaded = True
+        with self.store.lock():
+            records = self.store.load()
+
+        # Entries found on disk are less recent than the ones used in memory
+        loaded = sorted(((k, tuple(v)) for k, v in records.items()
+                         if k not in self.records), key=lambda i: i[1][1])
+        order = ([k for k, v in loaded] +
+                 sorted(self.records, key=self._used.get))
+        self.records.update(loaded)
+        self._used = dict((k, i) for i, k in enumerate(order))
+        self._ticks = itertools.count(len(order))
+        self._trim()
+
+    def _touch(self, key):
+        self._used[key] = next(self._ticks)
+
+    def _forget(self, key):
+        self.records.pop(key, None)
+        self._used.pop(key, None)
+
+    def _trim(self):
+        excess = len(self.records) - self.size
+        if excess > 0:
+            for key in sorted(self._used, key=self._used.get)[:excess]:
+                self._forget(key)
+
+    def _update_store(self, updates, forget=None):
+        if self.store is None:
+            return
+        now = time.time()
+        with self.store.lock():
+            records = self.store.load()
+            records.update(updates)
+            for key, value in list(records.items()):
+                if value[1] <= now or (forget and forget(key, value)):
+                    del records[key]
+            self.store.save(records)
+
+    def get(self, resource_type, project, name):
+        '''Return the ID cached for a name, or None.'''
+        key = self.make_key(resource_type, project, name)
+        with self._mutex:
+            self._load()
+            value = self.records.get(key)
+            if value is None or value[1] <= time.time():
+                self._forget(key)
+                return None
+            self._touch(key)
+            return value[0]
+
+    def put(self, resource_type, project, name, obj_id):
+        '''Remember the ID of a named resource.'''
+        key = self.make_key(resource_type, project, name)
+        value = (obj_id, time.time() + self.ttl)
+        with self._mutex:
+            self._load()
+            self.records[key] = value
+            self._touch(key)
+            self._trim()
+            self._update_store({key: value})
+
+    def invalidate(self, resource_type, project, name_or_id):
+        '''Forget the entries of a resource given its name or ID.'''
+        prefix = self.make_key(resource_type, project, '')
+
+        def _match(key, value):
+            return (key.startswith(prefix) and
+                    name_or_id in (key[len(prefix):], value[0]))
+
+        with self._mutex:
+            self._load()
+            for key in [k for k, v in self.records.items() if _match(k, v)]:
+                self._forget(key)
+            self._update_store({}, forget=_match)
+
+
+class HTTPCache(object):
+    '''An on-disk cache of HTTP response bodies and their validators.
+
+    Each response is kept in its own file, so that large bodies are only
+    read when they are needed. Files are replaced atomically, so they are
+    read without locking, a single lock on the directory serializes writes.
+    Entries not used for `max_age` seconds are dropped, as are the least
+    recently used ones beyond `max_entries`.
+    '''
+
+    #: Number of seconds an unused response is kept
+    DEFAULT_MAX_AGE = 7 * 24 * 3600
+    #: Maximum number of responses kept
+    DEFAULT_MAX_ENTRIES = 1000
+
+    def __init__(self, path=None, max_age=DEFAULT_MAX_AGE,
+                 max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path or os.path.join(cache_dir(), 'http')
+        self.max_age = max_age
+        self.max_entries = max_entries
+
+    def _file(self, key):
+        name = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.path, name + '.json')
+
+    def _lock(self):
+        makedirs(self.path)
+        return FileLock(os.path.join(self.path, '.lock'))
+
+    def _prune(self):
+        '''Remove the expired entries and the ones beyond the maximum.'''
+        entries = []
+        for name in os.listdir(self.path):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.path, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                pass
+
+        entries.sort(reverse=True)
+        oldest = time.time() - self.max_age
+        for i, (mtime, path) in enumerate(entries):
+            if i >= self.max_entries or mtime < oldest:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def get(self, key):
+        '''Return the response cached for a key, or None.'''
+        path = self._file(key)
+        try:
+            if os.path.getmtime(path) < time.time() - self.max_age:
+                return None
+        except OSError:
+            return None
+
+        response = JSONFileCache(path).load() or None
+        if response is not None:
+            # Mark the entry as recently used
+            try:
+                os.utime(path, None)
+            except OSError:
+                pass
+        return response
+
+    def put(self, key, response):
+        '''Cache a dict with the `body`, `etag` and `last_modified`.'''
+        with self._lock():
+            JSONFileCache(self._file(key)).save(response)
+            self._prune()
+
+    def delete(self, key):
+        with self._lock():
+            try:
+                os.remove(self._file(key))
+            except OSError:
+                pass
@@ -12,10 +12,6 @@
 
 import six
 
-from openstack import exceptions as sdkexc
-from oslo_serialization import jsonutils
-from requests import exceptions as reqexc
-
 from senlinclient.common.i18n import _
 
 verbose = False
@@ -38,6 +34,10 @@ class FileFormatError(BaseException):
     '''Illegal file format detected.'''
 
 
+class ActionTimeout(BaseException):
+    '''Timed out waiting for the action to complete.'''
+
+
 class HTTPException(BaseException):
     """Base exception for all HTTP-derived exceptions."""
     code = 'N/A'
@@ -229,8 +229,14 @@ def parse_exception(exc):
     '''Parse exception code and yield useful information.
     :param details: details of the exception.
     '''
+    # Imported here so that loading the exception classes stays cheap
+    from openstack import exceptions as sdkexc
+    from requests import exceptions as reqexc
+
+    from senlinclient.common import serialization
+
     if isinstance(exc, sdkexc.HttpException):
-        record = jsonutils.loads(exc.details)
+        record = serialization.loads(exc.details)
     elif isinstance(exc, reqexc.RequestException):
         # Exceptions that are not captured by SDK
         code = exc.message[1].errno
@@ -242,7 +248,7 @@ def parse_exception(exc):
         }
 
     elif isinstance(exc, six.string_types):
-        record = jsonutils.loads(exc)
+        record = serialization.loads(exc)
     else:
         print(_('Unknown exception: %s') % exc)
         return
@@ -0,0 +1,190 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import collections
+import threading
+import time
+
+
+class RequestCall(object):
+    '''A call of the client API, as seen by request hooks.
+
+    :ivar resource: Name of the resource class, e.g. 'Node'.
+    :ivar verb: One of 'list', 'get', 'create', 'update', 'delete' and
+                'action'.
+    :ivar detail: The name of the action for the 'action' verb.
+    :ivar start: Time the call started, as given by :func:`time.time`.
+    :ivar seconds: Time spent in the call so far. Lists are returned before
+                   the objects are retrieved, only the time spent retrieving
+                   them is counted, not the time spent by the caller.
+    :ivar bytes_sent: Number of bytes in the bodies of the requests sent.
+    :ivar bytes_received: Number of bytes in the bodies of the responses.
+    '''
+
+    def __init__(self, resource, verb, detail=None):
+        self.resource = resource
+        self.verb = verb
+        self.detail = detail
+        self.start = time.time()
+        self.seconds = 0.0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def add_bytes(self, sent, received):
+        self.bytes_sent += sent
+        self.bytes_received += received
+
+
+class RequestHook(object):
+    '''Base class for the hooks called by the client around API calls.
+
+    A call is passed to :meth:`before_request` when it starts, then to
+    either :meth:`after_request` or :meth:`on_error`. Exceptions raised by
+    hooks are logged and otherwise ignored.
+
+    A 'list' call is one listing, however many pages it takes. Lists
+    retrieving objects as they are consumed end when they are exhausted,
+    or when they are dropped after being started.
+    '''
+
+    def before_request(self, call):
+        pass
+
+    def after_request(self, call):
+        pass
+
+    def on_error(self, call, error):
+        pass
+
+
+class MetricsCollector(RequestHook):
+    '''Collect latency and traffic statistics per resource and verb.
+
+    Latencies are counted in histogram buckets, like Prometheus does, and
+    the most recent ones are kept for computing percentiles.
+
+    :param buckets: Upper bounds of the histogram buckets, in seconds.
+    :param window: Number of latencies kept for percentiles, per resource
+                   and verb.
+    '''
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets=None, window=1000):
+        self.buckets = tuple(sorted(buckets or self.BUCKETS))
+        self.window = window
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def _new_series(self):
+        return {
+            'count': 0,
+            'errors': 0,
+            'seconds_sum': 0.0,
+            'bytes_sent': 0,
+            'bytes_received': 0,
+            'buckets': [0] * len(self.buckets),
+            'recent': collections.deque(maxlen=self.window),
+        }
+
+    def _record(self, call, failed):
+        key = (call.resource, call.verb)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = self._new_series()
+            series['count'] += 1
+            series['errors'] += 1 if failed else 0
+            series['seconds_sum'] += call.seconds
+            series['bytes_sent'] += call.bytes_sent
+            series['bytes_received'] += call.bytes_received
+            series['recent'].append(call.seconds)
+            for i, bound in enumerate(self.buckets):
+                if call.seconds <= bound:
+                    series['buckets'][i] += 1
+
+    def after_request(self, call):
+        self._record(call, False)
+
+    def on_error(self, call, error):
+        self._record(call, True)
+
+    def reset(self):
+        with self._lock:
+            self._series = {}
+
+    @staticmethod
+    def _percentile(values, q):
+        if not values:
+            return None
+        values = sorted(values)
+        index = int(round(q / 100.0 * (len(values) - 1)))
+        return values[index]
+
+    def percentile(self, resource, verb, q):
+        '''Return a percentile of the recent latencies of a call, or None.
+
+        :param q: The percentile, between 0 and 100.
+        '''
+        with self._lock:
+            series = self._series.get((resource, verb))
+            recent = list(series['recent']) if series else []
+        return self._percentile(recent, q)
+
+    def snapshot(self):
+        '''Return the statistics as a list of dicts, one per resource/verb.
+
+        Bucket counts are cumulative, each one includes the calls counted in
+        the previous ones.
+        '''
+        with self._lock:
+            series = [(k, dict(v, buckets=list(v['buckets']),
+                               recent=list(v['recent'])))
+                      for k, v in self._series.items()]
+
+        stats = []
+        for (resource, verb), data in sorted(series):
+            recent = data.pop('recent')
+            buckets = data.pop('buckets')
+            data.update(resource=resource, verb=verb,
+                        p50=self._percentile(recent, 50),
+                        p90=self._percentile(recent, 90),
+                        p99=self._percentile(recent, 99),
+                        buckets=list(zip(self.buckets, buckets)))
+            stats.append(data)
+        return stats
+
+    def expose(self, prefix='senlinclient'):
+        '''Return the statistics in the Prometheus text exposition format.'''
+        stats = self.snapshot()
+        lines = ['# TYPE %s_request_seconds histogram' % prefix]
+        for data in stats:
+            labels = 'resource="%s",verb="%s"' % (data['resource'],
+                                                  data['verb'])
+            for bound, count in data['buckets']:
+                lines.append('%s_request_seconds_bucket{%s,le="%s"} %d' % (
+                    prefix, labels, bound, count))
+            lines.append('%s_request_seconds_bucket{%s,le="+Inf"} %d' % (
+                prefix, labels, data['count']))
+            lines.append('%s_request_seconds_sum{%s} %f' % (
+                prefix, labels, data['seconds_sum']))
+            lines.append('%s_request_seconds_count{%s} %d' % (
+                prefix, labels, data['count']))
+
+        for name, key in (('request_errors_total', 'errors'),
+                          ('sent_bytes_total', 'bytes_sent'),
+                          ('received_bytes_total', 'bytes_received')):
+            lines.append('# TYPE %s_%s counter' % (prefix, name))
+            for data in stats:
+                lines.append('%s_%s{resource="%s",verb="%s"} %d' % (
+                    prefix, name, data['resource'], data['verb'], data[key]))
+        return '\n'.join(lines) + '\n'
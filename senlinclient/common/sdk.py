@@ -11,13 +11,16 @@
 # under the License.
 
 import argparse
+import collections
 import os
 
-from openstack import connection
 from openstack import exceptions
 from openstack import resource as base
 from openstack import user_preference
+from openstack import utils
 from senlinclient.common import exc
+from senlinclient.common import serialization
+from senlinclient.openstack.clustering import clustering_service
 
 # Alias here for consistency
 prop = base.prop
@@ -75,6 +78,18 @@ class UserPreferenceAction(argparse.Action):
         self.set_option(option_string, values)
 
 
+def get_json(session, url, **kwargs):
+    '''Send a GET request and decode the JSON reply.
+
+    The reply is decoded with the fastest JSON library available rather than
+    by the SDK transport.
+    '''
+    headers = kwargs.setdefault('headers', {})
+    headers['Accept'] = 'application/json'
+    resp = session.get(url, accept=None, **kwargs)
+    return serialization.loads(resp.content)
+
+
 class Resource(base.Resource):
     '''Senlin version of resource.
 
@@ -96,7 +111,7 @@ class Resource(base.Resource):
         else:
             url = cls.base_path
 
-        resp = session.get(url, service=cls.service, params=params).body
+        resp = get_json(session, url, service=cls.service, params=params)
         if cls.resources_key:
             resp = resp[cls.resources_key]
 
@@ -104,13 +119,259 @@ class Resource(base.Resource):
             value = cls.existing(**data)
             yield value
 
+    #: Whether the server can return a subset of the attributes, given as
+    #: a comma separated 'fields' query parameter.
+    allow_fields = False
+
+    # Record classes created by compact_record, by resource and fields
+    _records = {}
+
+    @classmethod
+    def field_names(cls):
+        '''Return the names of the attributes of the resource.'''
+        names = set()
+        for klass in cls.__mro__:
+            names.update(k for k, v in vars(klass).items()
+                         if isinstance(v, base.prop))
+        return names
+
+    @classmethod
+    def select_fields(cls, data, fields, params=None):
+        '''Prune decoded data to the given attributes, plus the ID.
+
+        If `params` is given and the server supports it, the fields are also
+        added to these query parameters.
+        '''
+        specs = cls.compact_record(fields)[1]
+        if params is not None and cls.allow_fields:
+            params['fields'] = ','.join(k for k, a, d in specs)
+        if data is None:
+            return None
+        keys = set(k for k, a, d in specs) | set(a for k, a, d in specs if a)
+        return dict((k, v) for k, v in data.items() if k in keys)
+
+    def get(self, session, include_headers=False, fields=None):
+        '''Get the remote resource, or only some of its attributes.'''
+        if not fields:
+            return super(Resource, self).get(session,
+                                             include_headers=include_headers)
+
+        if not self.allow_retrieve:
+            raise exceptions.MethodNotSupported('retrieve')
+        url = utils.urljoin(self.base_path % self, self.id)
+        params = {}
+        self.select_fields(None, fields, params)
+        resp = session.get(url, service=self.service, params=params)
+        body = resp.body
+        if self.resource_key:
+            body = body[self.resource_key]
+        if include_headers:
+            body.update(resp.headers)
+        self._attrs.update(self.select_fields(body, fields))
+        self._loaded = True
+        return self
+
+    @classmethod
+    def compact_record(cls, fields):
+        '''Return a record class for the given attributes, plus the ID.
+
+        The record class is a named tuple, along with the (key, alias,
+        default) specifications used to fill its fields from JSON data.
+        '''
+        fields = ('id',) + tuple(f for f in fields if f != 'id')
+        cache_key = (cls, fields)
+        if cache_key not in Resource._records:
+            specs = []
+            for field in fields:
+                attr = None
+                for klass in cls.__mro__:
+                    if field in vars(klass):
+                        attr = vars(klass)[field]
+                        break
+                if isinstance(attr, base.prop):
+                    specs.append((attr.name, attr.alias, attr.default))
+                else:
+                    specs.append((field, None, None))
+            record = collections.namedtuple(cls.__name__ + 'Record', fields)
+            Resource._records[cache_key] = (record, specs)
+        return Resource._records[cache_key]
+
+    @classmethod
+    def list_compact(cls, session, fields, path_args=None, **params):
+        '''Return a generator of compact records for a page of results.
+
+        Unlike list_short, the records are read-only named tuples holding
+        only the requested attributes and the ID, built directly from the
+        decoded JSON. They take a fraction of the memory and time needed by
+        full resources for long lists.
+        '''
+        if not cls.allow_list:
+            raise exceptions.MethodNotSupported('list')
+
+        if path_args:
+            url = cls.base_path % path_args
+        else:
+            url = cls.base_path
+
+        record, specs = cls.compact_record(fields)
+        cls.select_fields(None, fields, params)
+        resp = get_json(session, url, service=cls.service, params=params)
+        if cls.resources_key:
+            resp = resp[cls.resources_key]
+
+        for data in resp:
+            yield record._make(data[k] if k in data else data.get(a, d)
+                               for k, a, d in specs)
+
+    def get_cached(self, session, http_cache, key_prefix='', fields=None):
+        '''Get the remote resource, reusing a cached copy if unchanged.
+
+        The request is conditional on the ETag and Last-Modified date of the
+        copy in the cache, if the server replies 304 (Not Modified), the
+        cached body is used. Resources whose URL depends on other resources
+        are always downloaded.
+
+        :param http_cache: A :class:`cache.HTTPCache`.
+        :param key_prefix: A prefix added to the URL for the cache key,
+                           e.g. to separate projects.
+        :param fields: If specified, only these attributes are kept.
+        '''
+        if '%' in self.base_path:
+            return self.get(session, fields=fields)
+
+        url = utils.urljoin(self.base_path, self.id)
+        params = {}
+        if fields:
+            self.select_fields(None, fields, params)
+        key = key_prefix + url
+        if params:
+            key += '?fields=' + params['fields']
+        cached = http_cache.get(key)
+
+        # The transport only decodes the body when it sets the Accept header
+        # itself, which it fails to do on an empty 304 reply.
+        headers = {'Accept': 'application/json'}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        resp = session.get(url, service=self.service, accept=None,
+                           headers=headers, params=params)
+        if cached and resp.status_code == 304:
+            body = cached['body']
+        else:
+            body = serialization.loads(resp.content)
+            etag = resp.headers.get('ETag')
+            last_modified = resp.headers.get('Last-Modified')
+            if etag or last_modified:
+                http_cache.put(key, {'etag': etag,
+                                     'last_modified': last_modified,
+                                     'body': body})
+
+        if self.resource_key:
+            body = body[self.resource_key]
+        if fields:
+            body = self.select_fields(body, fields)
+        self._attrs.update(body)
+        self._loaded = True
+        return self
+
+
+def create_connection(preferences, user_agent, timeout=None, pool_size=None,
+                      max_retries=None, keep_alive=True, timings=None,
+                      **kwargs):
+    '''Create a connection to the cloud.
+
+    :param timeout: Seconds to wait for an API response, None means waiting
+                    forever.
+    :param pool_size: Maximum number of HTTP connections kept open per host,
+                      raise it when the connection is used from many
+                      threads.
+    :param max_retries: Number of retries on connection failures.
+    :param keep_alive: Whether HTTP connections are reused across requests.
+    :param timings: A :class:`timings.Timings` recording the HTTP requests.
+    :param kwargs: Authentication arguments.
+    '''
+    # The connection module pulls in the transport and the auth plugins,
+    # don't load it until a connection is really needed.
+    from openstack import connection
+    from senlinclient.common import transport
+
+    xport = transport.Transport(user_agent=user_agent,
+                                verify=kwargs.get('verify', True),
+                                timeout=timeout, pool_size=pool_size,
+                                max_retries=max_retries,
+                                keep_alive=keep_alive, timings=timings)
+    try:
+        conn = connection.Connection(transport=xport,
+                                     preference=preferences,
+                                     user_agent=user_agent,
+                                     **kwargs)
+    except exceptions.HttpException as ex:
+        exc.parse_exception(ex.details)
+
+    return conn
+
+
+def get_access_info(conn):
+    '''Return the raw access info of a connection as a dict.
+
+    The connection is authenticated first if it hasn't been. None is returned
+    if the authentication plugin doesn't keep any access info.
+    '''
+    get_access = getattr(conn.authenticator, 'get_access', None)
+    if get_access is None:
+        return None
+
+    try:
+        access_info = get_access(conn.transport)
+    except exceptions.HttpException as ex:
+        exc.parse_exception(ex.details)
+
+    # NOTE: AccessInfo doesn't provide a public way to get the token data
+    return dict(access_info._info)
+
+
+def get_project_id(session):
+    '''Return the ID of the project a session is scoped to, or None.'''
+    get_access = getattr(session.authenticator, 'get_access', None)
+    if get_access is None:
+        return None
+
+    try:
+        return get_access(session.transport).project_id
+    except exceptions.HttpException as ex:
+        exc.parse_exception(ex.details)
+
+
+def set_access_info(conn, info):
+    '''Make a connection reuse access info saved by get_access_info.'''
+    from openstack.auth import access
+
+    conn.authenticator.access_info = access.AccessInfo.factory(**info)
+
+
+def cache_endpoints(conn, ttl=None, override=None):
+    '''Cache the clustering endpoint resolved for a connection.
+
+    Requests to the clustering service will reuse the endpoint found in the
+    service catalog for `ttl` seconds instead of walking the catalog every
+    time. If `override` is given, it is used as the clustering endpoint and
+    the catalog is skipped entirely.
+
+    :returns: The :class:`EndpointCache` installed for the connection.
+    '''
+    if ttl is None:
+        ttl = clustering_service.EndpointCache.DEFAULT_TTL
+    cache = clustering_service.EndpointCache(ttl=ttl, override=override)
+    resolve = conn.authenticator.get_endpoint
 
-def create_connection(preferences, user_agent, **kwargs):
-        try:
-            conn = connection.Connection(preference=preferences,
-                                         user_agent=user_agent,
-                                         **kwargs)
-        except exceptions.HttpException as ex:
-            exc.parse_exception(ex.details)
+    def get_endpoint(transport, service, **kwargs):
+        if service is not None and service.service_type == 'clustering':
+            return cache.get_endpoint(resolve, transport, service, **kwargs)
+        return resolve(transport, service, **kwargs)
 
-        return conn
+    conn.authenticator.get_endpoint = get_endpoint
+    return cache
@@ -0,0 +1,81 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+'''
+JSON encoding and decoding through the fastest library available.
+
+orjson is used when it is installed, the standard json module otherwise.
+Another backend, e.g. ujson, can be forced with
+env[SENLINCLIENT_JSON_BACKEND]. See tools/json_benchmark.py to compare them.
+'''
+
+import os
+
+from oslo_utils import importutils
+
+#: Supported backends
+BACKENDS = ('orjson', 'ujson', 'json')
+#: Backends selected automatically, by order of preference. ujson decodes
+#: more slowly than the json module of recent Python versions.
+PREFERRED_BACKENDS = ('orjson', 'json')
+
+_backend = None
+_module = None
+
+
+def get_backend():
+    '''Return the name of the backend in use, selecting it if needed.'''
+    if _backend is None:
+        forced = os.environ.get('SENLINCLIENT_JSON_BACKEND')
+        for name in (forced,) if forced else PREFERRED_BACKENDS:
+            if name == 'json' or importutils.try_import(name):
+                set_backend(name)
+                break
+        else:
+            set_backend('json')
+    return _backend
+
+
+def set_backend(name):
+    '''Use the given backend, e.g. for comparing them.'''
+    global _backend, _module
+    if name not in BACKENDS:
+        raise ValueError('Unknown JSON backend: %s' % name)
+    _module = importutils.import_module(name)
+    _backend = name
+
+
+def loads(data):
+    '''Decode a JSON document given as text or as UTF-8 encoded bytes.'''
+    if get_backend() == 'json' and isinstance(data, bytes):
+        data = data.decode('utf-8')
+    return _module.loads(data)
+
+
+def dumps(obj, indent=None, ensure_ascii=False):
+    '''Encode an object as JSON text.
+
+    Objects that JSON doesn't support natively, like dates, are converted
+    as by oslo.serialization. Only orjson is used for encoding, ujson
+    doesn't convert such objects.
+    '''
+    from oslo_serialization import jsonutils
+
+    if get_backend() == 'orjson' and not ensure_ascii and indent in (None, 2):
+        option = _module.OPT_INDENT_2 if indent else 0
+        try:
+            return _module.dumps(obj, default=jsonutils.to_primitive,
+                                 option=option).decode('utf-8')
+        except TypeError:
+            # e.g. keys that are not strings, let the default encoder try
+            pass
+    return jsonutils.dumps(obj, indent=indent, ensure_ascii=ensure_ascii)
@@ -0,0 +1,113 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from __future__ import print_function
+
+import contextlib
+import sys
+import threading
+import timeit
+
+from senlinclient.common import serialization
+
+
+class Timings(object):
+    '''Wall time of the phases of a command and of its HTTP requests.
+
+    Phases are recorded with the :meth:`phase` context manager, requests are
+    recorded by the transport through :meth:`add_request`, possibly from
+    several threads.
+    '''
+
+    def __init__(self):
+        self.start = timeit.default_timer()
+        self.phases = []
+        self.requests = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        '''Record the time spent in a block under the given name.'''
+        start = timeit.default_timer()
+        try:
+            yield
+        finally:
+            self.phases.append({
+                'name': name,
+                'start': start - self.start,
+                'seconds': timeit.default_timer() - start,
+            })
+
+    def add_request(self, method, url, status, size, start, seconds):
+        '''Record an HTTP request.
+
+        :param status: The status code of the response, None if no response
+                       was received.
+        :param size: Number of bytes in the response body.
+        :param start: Value of :func:`timeit.default_timer` when the request
+                      was sent.
+        '''
+        with self._lock:
+            self.requests.append({
+                'method': method,
+                'url': url,
+                'status': status,
+                'bytes': size,
+                'start': start - self.start,
+                'seconds': seconds,
+            })
+
+    def to_dict(self):
+        return {
+            'total': timeit.default_timer() - self.start,
+            'phases': sorted(self.phases, key=lambda p: p['start']),
+            'requests': sorted(self.requests, key=lambda r: r['start']),
+        }
+
+    def dump(self, path):
+        '''Save the timings as JSON to a file.'''
+        with open(path, 'w') as f:
+            f.write(serialization.dumps(self.to_dict(), indent=2))
+
+    def print_summary(self, stream=None):
+        '''Print the phases and the requests as tables, to stderr by default.
+
+        Standard output is left alone so that the output of the command can
+        still be parsed.
+        '''
+        import prettytable
+
+        stream = stream or sys.stderr
+        data = self.to_dict()
+
+        pt = prettytable.PrettyTable(['Phase', 'Start', 'Seconds'],
+                                     caching=False)
+        pt.align = 'l'
+        for phase in data['phases']:
+            pt.add_row([phase['name'], '%.3f' % phase['start'],
+                        '%.3f' % phase['seconds']])
+        pt.add_row(['total', '', '%.3f' % data['total']])
+        print(pt.get_string(), file=stream)
+
+        if not data['requests']:
+            return
+        pt = prettytable.PrettyTable(['Method', 'URL', 'Status', 'Bytes',
+                                      'Start', 'Seconds'], caching=False)
+        pt.align = 'l'
+        for req in data['requests']:
+            pt.add_row([req['method'], req['url'], req['status'] or '',
+                        req['bytes'], '%.3f' % req['start'],
+                        '%.3f' % req['seconds']])
+        pt.add_row(['%d requests' % len(data['requests']), '', '',
+                    sum(r['bytes'] for r in data['requests']), '',
+                    '%.3f' % sum(r['seconds'] for r in data['requests'])])
+        print(pt.get_string(), file=stream)
@@ -0,0 +1,98 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import contextlib
+import threading
+import timeit
+
+from openstack import transport
+from requests import adapters
+
+
+class Transport(transport.Transport):
+    '''SDK transport with tunable connection pooling.
+
+    The default transport keeps up to 10 connections per host, which makes
+    threads sharing a client wait for each other, and it never times out.
+    It can also record the time taken by each request.
+    '''
+
+    def __init__(self, user_agent=None, verify=True, timeout=None,
+                 pool_size=None, max_retries=None, keep_alive=True,
+                 timings=None):
+        '''Create a transport.
+
+        :param timeout: Seconds to wait for the server to respond, None
+                        means waiting forever.
+        :param pool_size: Maximum number of connections kept open per host.
+        :param max_retries: Number of retries on connection failures.
+        :param keep_alive: Whether connections are reused across requests.
+        :param timings: A :class:`timings.Timings` recording every request.
+        '''
+        super(Transport, self).__init__(user_agent=user_agent, verify=verify)
+        self.timeout = timeout
+        self.timings = timings
+        self._local = threading.local()
+
+        if pool_size or max_retries:
+            pool_size = pool_size or adapters.DEFAULT_POOLSIZE
+            adapter = adapters.HTTPAdapter(
+                pool_connections=pool_size, pool_maxsize=pool_size,
+                max_retries=max_retries or adapters.DEFAULT_RETRIES)
+            self.mount('http://', adapter)
+            self.mount('https://', adapter)
+
+        if not keep_alive:
+            self.headers['Connection'] = 'close'
+
+    def request(self, method, url, redirect=None, **kwargs):
+        if self.timeout is not None:
+            kwargs.setdefault('timeout', self.timeout)
+        return super(Transport, self).request(method, url, redirect=redirect,
+                                              **kwargs)
+
+    @contextlib.contextmanager
+    def counting(self, counter):
+        '''Count the bytes transferred by the current thread in a block.
+
+        :param counter: An object whose add_bytes(sent, received) method is
+                        called after each request.
+        '''
+        counters = self._local.__dict__.setdefault('counters', [])
+        counters.append(counter)
+        try:
+            yield counter
+        finally:
+            counters.remove(counter)
+
+    def send(self, request, **kwargs):
+        # Every request goes through here, including the ones following
+        # redirections, and the body has been downloaded on return
+        counters = getattr(self._local, 'counters', None)
+        if self.timings is None and not counters:
+            return super(Transport, self).send(request, **kwargs)
+
+        start = timeit.default_timer()
+        status = None
+        size = 0
+        try:
+            resp = super(Transport, self).send(request, **kwargs)
+            status = resp.status_code
+            size = len(resp.content or b'')
+            return resp
+        finally:
+            if self.timings is not None:
+                self.timings.add_request(request.method, request.url, status,
+                                         size, start,
+                                         timeit.default_timer() - start)
+            for counter in counters or ():
+                counter.add_bytes(len(request.body or b''), size)
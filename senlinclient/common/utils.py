@@ -13,16 +13,19 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-import prettytable
+from __future__ import print_function
+
+import itertools
 import six
-import yaml
+import sys
+import threading
+import time
 
-from oslo_serialization import jsonutils
 from oslo_utils import importutils
 
-from heatclient.common import template_utils
 from senlinclient.common import exc
 from senlinclient.common.i18n import _
+from senlinclient.common import serialization
 from senlinclient.openstack.common import cliutils
 
 
@@ -33,9 +36,24 @@ env = cliutils.env
 print_list = cliutils.print_list
 exit = cliutils.exit
 
+# NOTE: Modules such as prettytable, yaml, oslo_serialization and heatclient
+# are imported by the functions that use them. Loading them at module level
+# slows down every invocation of the CLI, including the ones that never need
+# them, e.g. 'senlin help'.
+
+
+def _format_json(x):
+    return serialization.dumps(x, indent=2)
+
+
+def _format_yaml(x):
+    import yaml
+    return yaml.safe_dump(x, default_flow_style=False)
+
+
 supported_formats = {
-    "json": lambda x: jsonutils.dumps(x, indent=2),
-    "yaml": lambda x: yaml.safe_dump(x, default_flow_style=False)
+    "json": _format_json,
+    "yaml": _format_yaml,
 }
 
 
@@ -47,6 +65,8 @@ def import_versioned_module(version, submodule=None):
 
 
 def format_nested_dict(d, fields, column_names):
+    import prettytable
+
     if d is None:
         return ''
     pt = prettytable.PrettyTable(caching=False, print_empty=False,
@@ -59,8 +79,7 @@ def format_nested_dict(d, fields, column_names):
         if value is six.string_types:
             pt.add_row([field, value])
         else:
-            pt.add_row([field, jsonutils.dumps(value, indent=2,
-                                               ensure_ascii=False)])
+            pt.add_row([field, serialization.dumps(value, indent=2)])
 
     return pt.get_string()
 
@@ -70,30 +89,144 @@ def nested_dict_formatter(d, column_names):
 
 
 def json_formatter(js):
-    return jsonutils.dumps(js, indent=2, ensure_ascii=False)
+    return serialization.dumps(js, indent=2)
 
 
 def list_formatter(record):
     return '\n'.join(record or [])
 
 
+# Output formats supported by print_list
+list_formats = ['table', 'csv', 'json', 'jsonl', 'yaml', 'value']
+
+# Number of rows used to compute the column widths of a streamed table
+TABLE_SAMPLE_SIZE = 100
+
+
+def _get_rows(objs, fields, formatters, mixed_case_fields):
+    for o in objs:
+        if o is None:
+            # Marks a pause in a stream, let it through for flushing
+            yield None
+            continue
+        row = []
+        for field in fields:
+            if field in formatters:
+                row.append(formatters[field](o))
+            else:
+                if field in mixed_case_fields:
+                    field_name = field.replace(' ', '_')
+                else:
+                    field_name = field.lower().replace(' ', '_')
+                row.append(getattr(o, field_name, ''))
+        yield row
+
+
+def _print_table_stream(rows, labels, sample_size=TABLE_SAMPLE_SIZE):
+    '''Print rows as a table without holding all of them in memory.
+
+    Column widths are computed from the first rows only, or from the rows
+    received before a pause in the stream. Longer values met later on are
+    printed in full, at the expense of the alignment.
+    '''
+    rows = (row and ['' if v is None else six.text_type(v) for v in row]
+            for row in rows)
+    sample = list(itertools.islice(
+        itertools.takewhile(lambda row: row is not None, rows), sample_size))
+    widths = [len(label) for label in labels]
+    for row in sample:
+        widths = [max(w, len(v)) for w, v in zip(widths, row)]
+
+    def _line(cells):
+        return '| %s |' % ' | '.join(c.ljust(w) for c, w in zip(cells, widths))
+
+    border = '+%s+' % '+'.join('-' * (w + 2) for w in widths)
+    print(border)
+    print(_line(labels))
+    print(border)
+    for row in sample:
+        print(_line(row))
+    sys.stdout.flush()
+    for row in _flushed(rows):
+        print(_line(row))
+    print(border)
+
+
+def _flushed(rows):
+    '''Skip the pauses of a stream of rows, flushing the output on them.'''
+    for row in rows:
+        if row is None:
+            sys.stdout.flush()
+        else:
+            yield row
+
+
+def _print_stream(rows, labels, output_format):
+    if output_format != 'table':
+        rows = _flushed(rows)
+
+    if output_format == 'csv':
+        import csv
+        writer = csv.writer(sys.stdout)
+        writer.writerow(labels)
+        for row in rows:
+            writer.writerow(row)
+    elif output_format == 'json':
+        sep = '['
+        for row in rows:
+            sys.stdout.write('%s\n%s' % (
+                sep, serialization.dumps(dict(zip(labels, row)), indent=2)))
+            sep = ','
+        print('[]' if sep == '[' else '\n]')
+    elif output_format == 'jsonl':
+        for row in rows:
+            print(serialization.dumps(dict(zip(labels, row))))
+    elif output_format == 'yaml':
+        import yaml
+        for row in rows:
+            sys.stdout.write(yaml.safe_dump([dict(zip(labels, row))],
+                                            default_flow_style=False))
+    elif output_format == 'value':
+        for row in rows:
+            print(' '.join('' if v is None else six.text_type(v)
+                           for v in row))
+    else:
+        _print_table_stream(rows, labels)
+
+
 def print_list(objs, fields, formatters=None, sortby_index=0,
-               mixed_case_fields=None, field_labels=None):
+               mixed_case_fields=None, field_labels=None,
+               output_format='table', stream=False):
+    '''Print a list of objects in the given output format.
+
+    The 'table' format buffers and sorts all the rows unless `stream` is
+    True, in which case the column widths are computed from the first rows
+    and rows are printed in the order they are received. All the other
+    formats are always streamed, without sorting. When streaming, `objs`
+    may contain None to mark a pause, the output is flushed there.
+    '''
     # This wrapper is needed because sdk may yield a generator that will
     # escape the exception catching previously
     if not objs:
         objs = []
 
     try:
-        cliutils.print_list(objs, fields, formatters=formatters,
-                            sortby_index=sortby_index,
-                            mixed_case_fields=mixed_case_fields,
-                            field_labels=field_labels)
+        if output_format == 'table' and not stream:
+            cliutils.print_list(objs, fields, formatters=formatters,
+                                sortby_index=sortby_index,
+                                mixed_case_fields=mixed_case_fields,
+                                field_labels=field_labels)
+        else:
+            rows = _get_rows(objs, fields, formatters or {},
+                             mixed_case_fields or [])
+            _print_stream(rows, field_labels or fields, output_format)
     except Exception as ex:
         exc.parse_exception(ex)
 
 
 def print_dict(d, formatters=None):
+    import prettytable
+
     formatters = formatters or {}
     pt = prettytable.PrettyTable(['Property', 'Value'],
                                  caching=False, print_empty=False)
@@ -107,6 +240,60 @@ def print_dict(d, formatters=None):
     print(pt.get_string(sortby='Property'))
 
 
+class RateLimiter(object):
+    '''Space out the calls made from any number of threads.
+
+    :param rate: Maximum number of calls per second.
+    '''
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        '''Sleep until the next call is allowed.'''
+        with self._lock:
+            now = time.time()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+    def wrap(self, func):
+        '''Return a function calling `func` at the limited rate.'''
+        def _limited(*args, **kwargs):
+            self.wait()
+            return func(*args, **kwargs)
+        return _limited
+
+
+def parallel_map(func, items, workers=1, rate=None):
+    '''Apply a function to each item using up to the given number of threads.
+
+    Results are returned in the order of the items. If the function raises an
+    exception for any item, the exception is re-raised once all items have
+    been processed.
+
+    :param rate: If specified, the maximum number of calls started per
+                 second.
+    '''
+    items = list(items)
+    if rate:
+        func = RateLimiter(rate).wrap(func)
+    if not workers or workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+
+    from multiprocessing import pool
+
+    thread_pool = pool.ThreadPool(min(workers, len(items)))
+    try:
+        return thread_pool.map(func, items)
+    finally:
+        thread_pool.close()
+        thread_pool.join()
+
+
 def format_parameters(params, parse_semicolon=True):
     '''Reformat parameters into dict of format expected by the API.'''
     if not params:
@@ -137,6 +324,8 @@ def format_parameters(params, parse_semicolon=True):
 
 
 def get_spec_content(filename):
+    import yaml
+
     with open(filename, 'r') as f:
         try:
             data = yaml.load(f)
@@ -147,6 +336,8 @@ def get_spec_content(filename):
 
 
 def process_stack_spec(spec):
+    from heatclient.common import template_utils
+
     # Heat stack is a headache, because it demands for client side file
     # content processing
     tmplfile = spec.get('template', None)
@@ -10,6 +10,8 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import time
+
 from openstack.auth import service_filter
 
 
@@ -25,3 +27,48 @@ class ClusteringService(service_filter.ServiceFilter):
             service_type='clustering',
             version=version
         )
+
+
+class EndpointCache(object):
+    """Cache of clustering endpoints resolved from the service catalog.
+
+    Endpoints are remembered per region, visibility, service name and
+    version for `ttl` seconds. If `override` is set, it is returned for all
+    clustering requests and the service catalog is not consulted at all.
+    """
+
+    #: Default number of seconds a resolved endpoint is reused
+    DEFAULT_TTL = 300
+
+    def __init__(self, ttl=DEFAULT_TTL, override=None):
+        self.ttl = ttl
+        self.override = override
+        self._endpoints = {}
+
+    @staticmethod
+    def _key(service):
+        return (service.region, service.visibility, service.service_name,
+                service.version)
+
+    def get_endpoint(self, resolve, transport, service, **kwargs):
+        """Return the endpoint for a clustering service filter.
+
+        :param resolve: The authenticator method that walks the catalog.
+        :param transport: Transport used by the authenticator, if needed.
+        :param service: The service filter of the request.
+        """
+        if self.override:
+            return self.override
+
+        key = self._key(service)
+        now = time.time()
+        cached = self._endpoints.get(key)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+
+        endpoint = resolve(transport, service, **kwargs)
+        self._endpoints[key] = (endpoint, now + self.ttl)
+        return endpoint
+
+    def invalidate(self):
+        self._endpoints.clear()
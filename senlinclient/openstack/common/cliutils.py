@@ -26,7 +26,6 @@ import textwrap
 
 from oslo_utils import encodeutils
 from oslo_utils import strutils
-import prettytable
 import six
 from six import moves
 
@@ -151,6 +150,8 @@ def print_list(objs, fields, formatters=None, sortby_index=0,
     :param field_labels: Labels to use in the heading of the table, default to
         fields.
     """
+    import prettytable
+
     formatters = formatters or {}
     mixed_case_fields = mixed_case_fields or []
     field_labels = field_labels or fields
@@ -193,6 +194,8 @@ def print_dict(dct, dict_property="Property", wrap=0):
     :param dict_property: name of the first column
     :param wrap: wrapping for the second column
     """
+    import prettytable
+
     pt = prettytable.PrettyTable([dict_property, 'Value'])
     pt.align = 'l'
     for k, v in six.iteritems(dct):
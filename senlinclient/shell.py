@@ -18,6 +18,8 @@ from __future__ import print_function
 
 import argparse
 import logging
+import os
+import shlex
 import six
 import sys
 
@@ -27,12 +29,16 @@ from oslo_utils import importutils
 import senlinclient
 from senlinclient import cliargs
 from senlinclient import client as senlin_client
+from senlinclient.common import cache
 from senlinclient.common import exc
 from senlinclient.common.i18n import _
 from senlinclient.common import sdk
+from senlinclient.common import timings
 from senlinclient.common import utils
 
 osprofiler_profiler = importutils.try_import("osprofiler.profiler")
+# Importing readline gives line editing and history to 'senlin shell'
+readline = importutils.try_import("readline")
 USER_AGENT = 'python-senlinclient'
 LOG = logging.getLogger(__name__)
 
@@ -45,6 +51,13 @@ class HelpFormatter(argparse.HelpFormatter):
 
 
 class SenlinShell(object):
+    token_cache = None
+    token_key = None
+    api_ver = None
+    options = None
+    timings = None
+    _dispatch_parser = None
+
     def _setup_logging(self, debug):
         log_lvl = logging.DEBUG if debug else logging.WARNING
         logging.basicConfig(format="%(levelname)s (%(module)s) %(message)s",
@@ -56,11 +69,20 @@ class SenlinShell(object):
         if verbose:
             exc.verbose = 1
 
-    def _find_actions(self, subparsers, actions_module):
+    def _get_commands(self, actions_module):
+        commands = {}
         for attr in (a for a in dir(actions_module) if a.startswith('do_')):
             command = attr[3:].replace('_', '-')
-            callback = getattr(actions_module, attr)
+            commands[command] = getattr(actions_module, attr)
+        return commands
+
+    def _find_actions(self, subparsers, actions_module, command=None):
+        commands = self._get_commands(actions_module)
+        if command is not None:
+            commands = dict((c, f) for c, f in commands.items()
+                            if c == command)
 
+        for command, callback in sorted(commands.items()):
             # get callback documentation string
             desc = callback.__doc__ or ''
             help = desc.strip().split('\n')[0]
@@ -118,15 +140,32 @@ class SenlinShell(object):
         self.subcommands['bash_completion'] = subparser
         subparser.set_defaults(func=self.do_bash_completion)
 
-    def get_subcommand_parser(self, base_parser, version):
+    def get_subcommand_parser(self, base_parser, version, command=None):
+        '''Build the subcommand parser.
+
+        If `command` names a known subcommand, only the parser for that
+        subcommand is built. Building the parsers of all the other commands
+        is a waste of time when we already know which one is going to run.
+        Help and bash completion need the full set of subcommands.
+        '''
         parser = base_parser
 
         self.subcommands = {}
         subparsers = parser.add_subparsers(metavar='<subcommand>')
         submodule = utils.import_versioned_module(version, 'shell')
-        self._find_actions(subparsers, submodule)
-        self._find_actions(subparsers, self)
-        self._add_bash_completion_subparser(subparsers)
+
+        if command in ('help', 'bash-completion'):
+            command = None
+        elif command is not None:
+            known = (list(self._get_commands(submodule)) +
+                     list(self._get_commands(self)))
+            if command not in known:
+                command = None
+
+        self._find_actions(subparsers, submodule, command)
+        self._find_actions(subparsers, self, command)
+        if command is None:
+            self._add_bash_completion_subparser(subparsers)
 
         return parser
 
@@ -143,6 +182,104 @@ class SenlinShell(object):
         else:
             self.parser.print_help()
 
+    def _get_dispatch_parser(self):
+        '''Return a parser for all subcommands, without global options.'''
+        if self._dispatch_parser is None:
+            parser = argparse.ArgumentParser(prog='senlin', add_help=False,
+                                             formatter_class=HelpFormatter)
+            self._dispatch_parser = self.get_subcommand_parser(parser,
+                                                               self.api_ver)
+            self.parser = self._dispatch_parser
+        return self._dispatch_parser
+
+    def _dispatch(self, sc, line):
+        '''Run a command line using an existing client.
+
+        :returns: True if the command succeeded, False otherwise.
+        '''
+        argv = shlex.split(line, comments=True)
+        if not argv:
+            return True
+
+        parser = self._get_dispatch_parser()
+        try:
+            args = parser.parse_args(argv)
+        except SystemExit:
+            # argparse has already printed the usage and the error
+            return False
+
+        try:
+            if args.func == self.do_help:
+                self.do_help(args)
+            elif args.func == self.do_bash_completion:
+                self.do_bash_completion(args)
+            elif args.func in (self.do_shell, self.do_batch):
+                raise exc.CommandError(_("'%s' cannot be used from within "
+                                         "a shell or a batch") % argv[0])
+            else:
+                with self.timings.phase(argv[0]):
+                    args.func(sc, args)
+        except Exception as ex:
+            print(six.text_type(ex), file=sys.stderr)
+            return False
+
+        return True
+
+    def do_shell(self, sc, args):
+        '''Run commands interactively, authenticating only once.
+
+        Commands are entered without the leading 'senlin', e.g. 'node-list'.
+        Type 'quit', 'exit' or Ctrl-D to leave the shell.
+        '''
+        while True:
+            try:
+                line = six.moves.input('senlin> ')
+            except EOFError:
+                print()
+                break
+            except KeyboardInterrupt:
+                print()
+                continue
+
+            if line.strip() in ('quit', 'exit'):
+                break
+            try:
+                self._dispatch(sc, line)
+            except KeyboardInterrupt:
+                print(_('... interrupted'), file=sys.stderr)
+
+    @utils.arg('-x', '--exit-on-error', default=False, action='store_true',
+               help=_('Stop at the first command that fails.'))
+    @utils.arg('-f', '--file', metavar='<FILE>', required=True,
+               help=_('File containing the commands to run, one per line, '
+                      'without the leading "senlin". Use "-" for stdin.'))
+    def do_batch(self, sc, args):
+        '''Run commands from a file, authenticating only once.'''
+        if args.file == '-':
+            lines = sys.stdin.readlines()
+        else:
+            try:
+                with open(args.file, 'r') as f:
+                    lines = f.readlines()
+            except IOError as ex:
+                raise exc.CommandError(six.text_type(ex))
+
+        total = 0
+        failed = 0
+        for line in lines:
+            if not line.strip() or line.lstrip().startswith('#'):
+                continue
+            total += 1
+            if not self._dispatch(sc, line):
+                failed += 1
+                if args.exit_on_error:
+                    break
+
+        if failed:
+            msg = _('%(failed)s of %(total)s command(s) failed.') % {
+                'failed': failed, 'total': total}
+            raise exc.CommandError(msg)
+
     def _check_identity_arguments(self, args):
         # TODO(Qiming): validate the token authentication path and the trust
         # authentication path
@@ -227,12 +364,70 @@ class SenlinShell(object):
             'token': args.token,
             'trust_id': args.trust_id,
         }
-        conn = sdk.create_connection(args.user_preferences,
-                                     USER_AGENT, **kwargs)
-
-        return senlin_client.Client('1', conn.session)
+        # Make room for the requests sent concurrently by some commands
+        parallel = getattr(args, 'parallel', None)
+        pool_size = parallel if parallel and parallel > 10 else None
+        recorder = None
+        if args.timings or args.timings_file:
+            recorder = self.timings
+        conn = sdk.create_connection(args.user_preferences, USER_AGENT,
+                                     timeout=args.api_timeout,
+                                     pool_size=pool_size, timings=recorder,
+                                     **kwargs)
+        sdk.cache_endpoints(conn, override=args.senlin_url or None)
+        if args.token_cache:
+            self._setup_token_cache(conn, kwargs)
+
+        name_cache = None
+        if args.name_cache:
+            path = os.path.join(cache.cache_dir(), 'names.json')
+            name_cache = cache.NameCache(path=path)
+
+        http_cache = cache.HTTPCache() if args.http_cache else None
+
+        return senlin_client.Client('1', conn.session, name_cache=name_cache,
+                                    http_cache=http_cache)
+
+    def _setup_token_cache(self, conn, kwargs):
+        '''Reuse a cached token for the connection or cache a new one.'''
+        identity = dict((k, v) for k, v in kwargs.items()
+                        if k not in ('password', 'verify'))
+        self.token_cache = cache.TokenCache()
+        self.token_key = self.token_cache.make_key(**identity)
+
+        info = self.token_cache.get(self.token_key)
+        if info is not None:
+            sdk.set_access_info(conn, info)
+            return
+
+        info = sdk.get_access_info(conn)
+        if info is not None:
+            self.token_cache.put(self.token_key, info)
+
+    def _report_timings(self, args):
+        if args.timings:
+            self.timings.print_summary()
+        if args.timings_file:
+            try:
+                self.timings.dump(args.timings_file)
+            except IOError as ex:
+                print(_('Failed to save timings: %s') % ex, file=sys.stderr)
 
     def main(self, argv):
+        self.timings = timings.Timings()
+        with self.timings.phase('parse'):
+            args = self._parse_args(argv)
+        if args is None:
+            return 0
+
+        try:
+            self._run(args)
+        finally:
+            if args.timings or args.timings_file:
+                self._report_timings(args)
+
+    def _parse_args(self, argv):
+        '''Parse the command line, None means there is nothing left to do.'''
         # Parse args once to find version
         parser = argparse.ArgumentParser(
             prog='senlin',
@@ -253,17 +448,25 @@ class SenlinShell(object):
         self._setup_logging(options.debug)
         self._setup_verbose(options.verbose)
 
-        # build available subcommands based on version
+        # build available subcommands based on version, only the parser of
+        # the requested subcommand is built if there is one
         api_ver = options.senlin_api_version
         LOG.info(api_ver)
-        subcommand_parser = self.get_subcommand_parser(base_parser, api_ver)
+        self.api_ver = api_ver
+        command = None
+        for arg in args:
+            if not arg.startswith('-'):
+                command = arg
+                break
+        subcommand_parser = self.get_subcommand_parser(base_parser, api_ver,
+                                                       command)
         self.parser = subcommand_parser
 
         # Handle top-level --help/-h before attempting to parse
         # a command off the command line
         if not args and options.help or not argv:
             self.do_help(options)
-            return 0
+            return None
 
         # Parse args again and call whatever callback was selected
         args = subcommand_parser.parse_args(argv)
@@ -271,22 +474,36 @@ class SenlinShell(object):
         # Short-circuit and deal with help command right away.
         if args.func == self.do_help:
             self.do_help(args)
-            return 0
+            return None
         elif args.func == self.do_bash_completion:
             self.do_bash_completion(args)
-            return 0
+            return None
 
+        self.options = options
+        return args
+
+    def _run(self, args):
+        '''Authenticate and run the parsed command.'''
         # Check if identity information are sufficient
-        self._check_identity_arguments(args)
+        with self.timings.phase('check_identity'):
+            self._check_identity_arguments(args)
 
         # Setup Senlin client connection
-        sc = self._setup_senlin_client(api_ver, args)
+        with self.timings.phase('connect'):
+            sc = self._setup_senlin_client(self.api_ver, args)
 
-        profile = osprofiler_profiler and options.profile
+        profile = osprofiler_profiler and self.options.profile
         if profile:
-            osprofiler_profiler.init(options.profile)
-
-        args.func(sc, args)
+            osprofiler_profiler.init(self.options.profile)
+
+        try:
+            with self.timings.phase('command'):
+                args.func(sc, args)
+        except exc.HTTPUnauthorized:
+            # The cached token may have been revoked
+            if self.token_cache is not None:
+                self.token_cache.delete(self.token_key)
+            raise
 
         if profile:
             trace_id = osprofiler_profiler.get().get_base_id()
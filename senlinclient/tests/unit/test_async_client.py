@@ -0,0 +1,141 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+import sys
+
+import mock
+import testtools
+
+from senlinclient.common import exc
+from senlinclient.common import sdk
+from senlinclient.v1 import models
+
+TOOLS_DIR = os.path.join(os.path.dirname(__file__), '..', '..', '..',
+                         'tools')
+
+# 'async for' is a syntax error before Python 3.5, where these tests are
+# skipped, so the coroutine consuming a list is only compiled when needed
+COLLECT = '''
+async def collect(objs):
+    result = []
+    async for obj in objs:
+        result.append(obj)
+    return result
+'''
+
+
+class AsyncClientTest(testtools.TestCase):
+
+    def setUp(self):
+        super(AsyncClientTest, self).setUp()
+        if sys.version_info < (3, 5):
+            self.skipTest('The asynchronous client needs Python 3.5')
+
+        import asyncio
+
+        sys.path.insert(0, TOOLS_DIR)
+        self.addCleanup(sys.path.remove, TOOLS_DIR)
+        import fake_senlin_server
+        from senlinclient.v1 import async_client
+
+        self.data = fake_senlin_server.DataSet(nodes=25)
+        server = fake_senlin_server.FakeSenlinServer(('127.0.0.1', 0),
+                                                     self.data, page_size=10)
+        server.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        conn = sdk.create_connection(
+            None, 'senlinclient-tests', auth_url=server.url + '/v3',
+            user_id='demo', password='demo',
+            project_id=fake_senlin_server.PROJECT_ID)
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        asyncio.set_event_loop(self.loop)
+        self.addCleanup(asyncio.set_event_loop, None)
+        self.sc = async_client.AsyncClient(conn.session, max_connections=4)
+        self.addCleanup(self.sc.close)
+
+        namespace = {}
+        exec(COLLECT, namespace)
+        self.collect = namespace['collect']
+
+    def run_until_complete(self, awaitable):
+        return self.loop.run_until_complete(awaitable)
+
+    def test_get(self):
+        cluster = self.data.objects['clusters'][3]
+        obj = self.run_until_complete(
+            self.sc.get(models.Cluster, {'id': cluster['id']}))
+        self.assertEqual(cluster['name'], obj.name)
+
+    def test_get_not_found(self):
+        self.assertRaises(exc.HTTPNotFound, self.run_until_complete,
+                          self.sc.get(models.Node, {'id': 'missing'}))
+
+    def test_get_concurrently(self):
+        import asyncio
+
+        nodes = self.data.objects['nodes'][:8]
+        objs = self.run_until_complete(asyncio.gather(*[
+            self.sc.get(models.Node, {'id': n['id']}) for n in nodes]))
+        self.assertEqual([n['name'] for n in nodes], [o.name for o in objs])
+
+    def test_no_thread_per_call(self):
+        import asyncio
+
+        # Authenticate first, which is done in a thread of the executor
+        nodes = self.data.objects['nodes']
+        self.run_until_complete(self.sc.get(models.Node,
+                                            {'id': nodes[0]['id']}))
+        with mock.patch.object(self.loop, 'run_in_executor') as executor:
+            objs = self.run_until_complete(asyncio.gather(*[
+                self.sc.get(models.Node, {'id': n['id']}) for n in nodes]))
+        self.assertEqual(len(nodes), len(objs))
+        self.assertFalse(executor.called)
+
+    def test_create(self):
+        node = self.run_until_complete(self.sc.create(
+            models.Node, {'name': 'new-node', 'profile_id': 'profile-1'}))
+        self.assertEqual('new-node', self.data.find('nodes', node.id)['name'])
+
+    def test_delete(self):
+        node_id = self.data.objects['nodes'][0]['id']
+        self.run_until_complete(self.sc.delete(models.Node, {'id': node_id}))
+        self.assertIsNone(self.data.find('nodes', node_id))
+
+    def test_action(self):
+        cluster_id = self.data.objects['clusters'][0]['id']
+        result = self.run_until_complete(self.sc.action(
+            models.Cluster, {'id': cluster_id, 'action': 'scale_out',
+                             'action_args': {'count': 1}}))
+        action = self.data.find('actions', result['action'])
+        self.assertEqual(cluster_id, action['target'])
+        self.assertEqual('SCALE_OUT', action['action'])
+
+    def test_list_all_pages(self):
+        objs = self.run_until_complete(self.collect(
+            self.sc.list(models.Node, page_size=10)))
+        self.assertEqual([n['id'] for n in self.data.objects['nodes']],
+                         [o.id for o in objs])
+
+    def test_list_empty(self):
+        objs = self.run_until_complete(self.collect(
+            self.sc.list(models.Node, page_size=10, name='missing')))
+        self.assertEqual([], objs)
+
+    def test_list_error(self):
+        self.assertRaises(exc.HTTPBadRequest, self.run_until_complete,
+                          self.collect(self.sc.list(models.Node,
+                                                    page_size=10,
+                                                    marker='missing')))
@@ -0,0 +1,143 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import collections
+
+import mock
+import testtools
+
+from senlinclient.v1 import client
+from senlinclient.v1 import models
+
+Record = collections.namedtuple('Record', ['id'])
+
+
+def make_pages(*sizes):
+    '''Return pages of records with sequential IDs, then an empty page.'''
+    pages = []
+    count = 0
+    for size in sizes:
+        pages.append([Record('obj-%d' % i) for i in range(count,
+                                                          count + size)])
+        count += size
+    return pages + [[]]
+
+
+class ListPagesTest(testtools.TestCase):
+
+    def setUp(self):
+        super(ListPagesTest, self).setUp()
+        self.sc = client.Client(mock.Mock())
+        patcher = mock.patch.object(self.sc, '_list_page')
+        self.list_page = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_short_pages_capped_by_server(self):
+        # The server returns at most 100 objects whatever the page size
+        self.list_page.side_effect = make_pages(100, 100, 51)
+        objs = list(self.sc.list_all(models.Node, page_size=150))
+        self.assertEqual(251, len(objs))
+        self.assertEqual(4, self.list_page.call_count)
+        self.assertEqual('obj-250',
+                         self.list_page.call_args_list[3][1]['marker'])
+
+    def test_empty_list(self):
+        self.list_page.side_effect = make_pages()
+        self.assertEqual([], list(self.sc.list_pages(models.Node,
+                                                     page_size=10)))
+        self.assertEqual(1, self.list_page.call_count)
+
+
+Change = collections.namedtuple('Change', ['id', 'updated_time',
+                                           'created_time'])
+
+
+class ListChangesTest(testtools.TestCase):
+
+    def setUp(self):
+        super(ListChangesTest, self).setUp()
+        self.sc = client.Client(mock.Mock())
+        patcher = mock.patch.object(self.sc, 'list_pages')
+        self.list_pages = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(self.sc, 'list_page')
+        self.list_page = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.consumed = []
+
+    def _pages(self, *pages):
+        for page in pages:
+            self.consumed.append(page)
+            yield page
+
+    def _list_changes(self, updated, created, first=None):
+        self.list_pages.side_effect = [self._pages(*updated),
+                                       self._pages(*created)]
+        # The first object in ascending order of update time
+        self.list_page.return_value = [first] if first else []
+        return [o.id for o in self.sc.list_changes(models.Node, '2015-02')]
+
+    def test_nulls_first(self):
+        c = Change('c', '2015-04', '2015-01')
+        d = Change('d', '2015-01', '2015-01')
+        a = Change('a', None, '2015-01')
+        b = Change('b', None, '2015-03')
+        updated = [[a, b], [c, d]]
+        created = [[b, a]]
+        self.assertEqual(['c', 'b'],
+                         self._list_changes(updated, created, first=d))
+
+    def test_nulls_last(self):
+        a = Change('a', None, '2015-01')
+        b = Change('b', None, '2015-03')
+        updated = [[Change('c', '2015-04', '2015-01'), b], [a]]
+        created = [[b, a]]
+        self.assertEqual(['c', 'b'], self._list_changes(updated, created))
+        self.assertNotIn(updated[1], self.consumed)
+        self.assertFalse(self.list_page.called)
+
+    def test_no_update_time(self):
+        b = Change('b', None, '2015-03')
+        a = Change('a', None, '2015-01')
+        updated = [[b], [a]]
+        created = [[b, a]]
+        self.assertEqual(['b'], self._list_changes(updated, created, first=b))
+        self.assertNotIn(updated[1], self.consumed)
+
+
+class ObservedListTest(testtools.TestCase):
+
+    def setUp(self):
+        super(ObservedListTest, self).setUp()
+        self.hook = mock.Mock()
+        self.sc = client.Client(mock.Mock(transport=None),
+                                hooks=[self.hook])
+        patcher = mock.patch.object(self.sc, '_list_page')
+        self.list_page = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.list_page.side_effect = make_pages(10, 10, 5)
+
+    def test_list_all_is_one_call(self):
+        self.assertEqual(25, len(list(self.sc.list_all(models.Node,
+                                                       page_size=10))))
+        self.assertEqual(1, self.hook.before_request.call_count)
+        self.assertEqual(1, self.hook.after_request.call_count)
+        call = self.hook.after_request.call_args[0][0]
+        self.assertEqual(('Node', 'list'), (call.resource, call.verb))
+
+    def test_list_dropped_before_the_end(self):
+        objs = self.sc.list_all(models.Node, page_size=10)
+        next(objs)
+        self.assertFalse(self.hook.after_request.called)
+        objs.close()
+        self.assertEqual(1, self.hook.after_request.call_count)
+        self.assertFalse(self.hook.on_error.called)
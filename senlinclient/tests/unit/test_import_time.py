@@ -0,0 +1,77 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+import subprocess
+import sys
+
+import testtools
+
+#: Modules only needed by some commands, which must not be loaded by the
+#: shell module itself
+DEFERRED_MODULES = (
+    'heatclient',
+    'yaml',
+    'prettytable',
+    'oslo_serialization',
+    'openstack.connection',
+)
+
+#: Microseconds allowed for importing the shell module, can be raised on
+#: slow machines with env[SENLINCLIENT_IMPORT_BUDGET_US]
+IMPORT_BUDGET_US = 500000
+
+
+def import_times(module):
+    '''Import a module in a new interpreter, return the modules loaded.
+
+    :returns: A dict of the cumulative import time in microseconds of each
+              module loaded, as reported by 'python -X importtime'.
+    '''
+    proc = subprocess.Popen([sys.executable, '-X', 'importtime', '-c',
+                             'import %s' % module],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out, err = proc.communicate()
+    if proc.returncode:
+        raise AssertionError('Failed to import %s: %s' % (module, err))
+
+    times = {}
+    for line in err.decode('utf-8').splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        try:
+            cumulative = int(fields[1])
+        except ValueError:
+            # The header line
+            continue
+        times[fields[2].strip()] = cumulative
+    return times
+
+
+class ImportTimeTest(testtools.TestCase):
+
+    def setUp(self):
+        super(ImportTimeTest, self).setUp()
+        if sys.version_info < (3, 7):
+            self.skipTest('python -X importtime needs Python 3.7 or later')
+        self.times = import_times('senlinclient.shell')
+
+    def test_deferred_modules_not_loaded(self):
+        loaded = [m for m in DEFERRED_MODULES if m in self.times]
+        self.assertEqual([], loaded)
+
+    def test_import_budget(self):
+        budget = int(os.environ.get('SENLINCLIENT_IMPORT_BUDGET_US',
+                                    IMPORT_BUDGET_US))
+        self.assertIn('senlinclient.shell', self.times)
+        self.assertLess(self.times['senlinclient.shell'], budget)
@@ -0,0 +1,62 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import argparse
+import timeit
+
+import testtools
+
+from senlinclient import shell
+
+#: Minimum ratio between the times of building all the subcommand parsers
+#: and building the one of a single command, the measured ratio is about 40
+MIN_SPEEDUP = 5
+
+
+def build_parser(command):
+    '''Build the subcommand parser, return the shell.'''
+    senlin_shell = shell.SenlinShell()
+    parser = argparse.ArgumentParser(prog='senlin', add_help=False)
+    senlin_shell.get_subcommand_parser(parser, '1', command)
+    return senlin_shell
+
+
+def time_build(command, repeat=5):
+    return min(timeit.repeat(lambda: build_parser(command), number=1,
+                             repeat=repeat))
+
+
+class SubcommandParserTest(testtools.TestCase):
+
+    def test_single_command(self):
+        senlin_shell = build_parser('cluster-show')
+        self.assertEqual(['cluster-show'], list(senlin_shell.subcommands))
+
+    def test_all_commands(self):
+        senlin_shell = build_parser(None)
+        self.assertIn('cluster-show', senlin_shell.subcommands)
+        self.assertIn('bash_completion', senlin_shell.subcommands)
+
+    def test_help_builds_all_commands(self):
+        senlin_shell = build_parser('help')
+        self.assertIn('cluster-show', senlin_shell.subcommands)
+
+    def test_unknown_command_builds_all_commands(self):
+        senlin_shell = build_parser('no-such-command')
+        self.assertIn('cluster-show', senlin_shell.subcommands)
+
+    def test_single_command_faster(self):
+        single = time_build('cluster-show')
+        full = time_build(None)
+        self.assertGreater(full, single * MIN_SPEEDUP,
+                           'Building cluster-show took %.6fs, all the '
+                           'commands %.6fs' % (single, full))
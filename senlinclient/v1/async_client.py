@@ -0,0 +1,365 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+'''
+Asyncio clustering client, requires Python 3.5 or later.
+
+Example::
+
+    conn = sdk.create_connection(prefs, user_agent, **auth)
+    sc = async_client.AsyncClient(conn.session, max_connections=50)
+
+    cluster = await sc.get(models.Cluster, {'id': cluster_id})
+    async for node in sc.list(models.Node, cluster_id=cluster_id):
+        ...
+'''
+
+import asyncio
+import collections
+import timeit
+
+from openstack import utils
+
+from senlinclient.common import async_http
+from senlinclient.common import exc
+from senlinclient.common import hooks as client_hooks
+from senlinclient.common import serialization
+from senlinclient.v1 import client
+
+# Body of the responses to the requests recorded by _RecordingSession
+_PENDING = object()
+
+
+class _RecordingSession(object):
+    '''Session recording the requests of the action methods of models.
+
+    These methods send a request with the blocking session they are given
+    and return the body of the response. Given this session instead, they
+    return a placeholder, the recorded request is then sent asynchronously.
+    '''
+
+    body = _PENDING
+
+    def __init__(self):
+        self.requests = []
+
+    def _record(self, method, url, **kwargs):
+        self.requests.append((method, url, kwargs))
+        return self
+
+    def get(self, url, **kwargs):
+        return self._record('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self._record('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self._record('PUT', url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self._record('PATCH', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self._record('DELETE', url, **kwargs)
+
+
+def _base_path(cls, path_args):
+    if path_args:
+        return cls.base_path % path_args
+    return cls.base_path
+
+
+def _raise_error(resp):
+    '''Raise the exception mapped to an error response.'''
+    try:
+        record = resp.json()
+        record['error']['code']
+    except (ValueError, TypeError, KeyError):
+        record = {'error': {'code': resp.status_code,
+                            'message': resp.reason}}
+    exc.parse_exception(serialization.dumps(record))
+
+
+class _AsyncList(object):
+    '''Asynchronous iterator over the objects of a paginated list.
+
+    A page is requested once the objects of the previous one have all been
+    handed out, until an empty page is returned.
+    '''
+
+    def __init__(self, sc, cls, page_size, path_args, options):
+        self.sc = sc
+        self.cls = cls
+        self.page_size = page_size
+        self.path = _base_path(cls, path_args)
+        self.marker = options.pop('marker', None)
+        options.pop('limit', None)
+        self.options = options
+        self.objects = collections.deque()
+        self.call = None
+        self.done = False
+
+    def __aiter__(self):
+        return self
+
+    async def _next_page(self):
+        params = dict(self.options, limit=self.page_size, marker=self.marker)
+        body = await self.sc._request('GET', self.cls.service, self.path,
+                                      self.call, params=params)
+        if self.cls.resources_key:
+            body = body[self.cls.resources_key]
+        return [self.cls.existing(**data) for data in body]
+
+    async def __anext__(self):
+        if self.call is None:
+            self.call = self.sc._start_call(self.cls, 'list')
+        if not self.objects and not self.done:
+            try:
+                page = await self._next_page()
+            except Exception as ex:
+                self.done = True
+                self.sc._end_call(self.call, ex)
+                raise
+            if page:
+                self.marker = page[-1].id
+                self.objects.extend(page)
+            else:
+                self.done = True
+                self.sc._end_call(self.call)
+        if not self.objects:
+            raise StopAsyncIteration
+        return self.objects.popleft()
+
+    def __del__(self):
+        # Dropped by the caller before the end, which ends the call too
+        if self.call is not None and not self.done:
+            self.done = True
+            self.sc._end_call(self.call)
+
+
+class AsyncClient(object):
+    '''Clustering client whose calls are coroutines.
+
+    Requests are sent on asyncio streams by :class:`async_http.HTTPClient`,
+    a call waiting for its response holds no thread: hundreds of calls can
+    be in flight from the thread running the event loop, on up to
+    `max_connections` connections per host. The session is only used for
+    authenticating and finding the endpoints, from `executor` when there is
+    no valid token. Errors are mapped by :func:`exc.parse_exception` as they
+    are by the blocking client. Request hooks are called from the thread
+    running the event loop.
+
+    :param timeout: Seconds to wait for each response, default to the
+                    timeout of the transport of the session.
+    :param executor: The executor running the authentication requests, which
+                     are blocking, default to the one of the event loop.
+    '''
+
+    #: Renew the token if it expires within this many seconds
+    BEST_BEFORE_SECONDS = 60
+
+    def __init__(self, session, max_connections=10, timeout=None,
+                 user_agent=None, executor=None, hooks=None):
+        self.session = session
+        self.executor = executor
+        self.hooks = list(hooks or [])
+        transport = session.transport
+        if timeout is None:
+            timeout = getattr(transport, 'timeout', None)
+        self.http = async_http.HTTPClient(
+            max_connections=max_connections, timeout=timeout,
+            verify=getattr(transport, 'verify', True), user_agent=user_agent)
+        # Token and endpoint by service type
+        self._credentials = {}
+        self._auth_lock = None
+
+    def add_hook(self, hook):
+        '''Add a :class:`hooks.RequestHook` called around API calls.'''
+        self.hooks.append(hook)
+
+    def _run_hooks(self, name, call, *args):
+        for hook in self.hooks:
+            try:
+                getattr(hook, name)(call, *args)
+            except Exception:
+                client.LOG.exception('Request hook %s failed', name)
+
+    def _start_call(self, cls, verb, detail=None):
+        if not self.hooks:
+            return None
+        call = client_hooks.RequestCall(cls.__name__, verb, detail)
+        self._run_hooks('before_request', call)
+        return call
+
+    def _end_call(self, call, error=None):
+        if call is None:
+            return
+        if error is None:
+            self._run_hooks('after_request', call)
+        else:
+            self._run_hooks('on_error', call, error)
+
+    async def _observe(self, cls, verb, request, detail=None):
+        call = self._start_call(cls, verb, detail)
+        try:
+            result = await request(call)
+        except Exception as ex:
+            self._end_call(call, ex)
+            raise
+        self._end_call(call)
+        return result
+
+    def _expiring(self):
+        access_info = getattr(self.session.authenticator, 'access_info', None)
+        return (access_info is not None and
+                access_info.will_expire_soon(self.BEST_BEFORE_SECONDS))
+
+    def _authenticate(self, service):
+        # Called from the executor, the session may send blocking requests
+        auth = self.session.authenticator
+        if self._expiring():
+            auth.invalidate()
+        token = auth.get_token(self.session.transport)
+        preference = self.session.preference.get_preference(
+            service.service_type)
+        if preference:
+            service = preference.join(service)
+        return token, auth.get_endpoint(self.session.transport, service)
+
+    async def _get_credentials(self, service):
+        '''Return the token and the endpoint for a service.'''
+        if self._auth_lock is None:
+            self._auth_lock = asyncio.Lock()
+        async with self._auth_lock:
+            credentials = self._credentials.get(service.service_type)
+            if credentials is None or self._expiring():
+                loop = asyncio.get_event_loop()
+                try:
+                    credentials = await loop.run_in_executor(
+                        self.executor, self._authenticate, service)
+                except Exception as ex:
+                    exc.parse_exception(ex)
+                    raise
+                self._credentials[service.service_type] = credentials
+            return credentials
+
+    async def _request(self, method, service, path, call=None, **kwargs):
+        '''Send a request to a service, return the decoded body.'''
+        retried = False
+        while True:
+            token, endpoint = await self._get_credentials(service)
+            headers = {'X-Auth-Token': token} if token else {}
+            start = timeit.default_timer()
+            try:
+                resp = await self.http.request(
+                    method, utils.urljoin(endpoint, path), headers=headers,
+                    **kwargs)
+            except OSError as ex:
+                exc.parse_exception(serialization.dumps(
+                    {'error': {'code': ex.errno, 'message': str(ex)}}))
+            finally:
+                if call is not None:
+                    call.seconds += timeit.default_timer() - start
+            if call is not None:
+                call.add_bytes(resp.bytes_sent, len(resp.content))
+
+            if resp.status_code == 401 and not retried:
+                # The token may have been revoked, authenticate again
+                retried = True
+                self.session.authenticator.invalidate()
+                self._credentials = {}
+                continue
+            if resp.status_code >= 400:
+                _raise_error(resp)
+            return resp.json()
+
+    def list(self, cls, page_size=None, path_args=None, **options):
+        '''Return an asynchronous iterator over all objects of a list.'''
+        return _AsyncList(self, cls, page_size, path_args, options)
+
+    async def get(self, cls, options=None):
+        obj = cls.new(**(options or {}))
+
+        async def _get(call):
+            path = utils.urljoin(_base_path(cls, obj), obj.id)
+            body = await self._request('GET', cls.service, path, call)
+            if cls.resource_key:
+                body = body[cls.resource_key]
+            return cls.existing(**body)
+
+        return await self._observe(cls, 'get', _get)
+
+    async def create(self, cls, params):
+        obj = cls.new(**params)
+        attrs = dict(obj)
+        body = {cls.resource_key: attrs} if cls.resource_key else attrs
+
+        async def _create(call):
+            path = _base_path(cls, obj)
+            if obj.id:
+                resp = await self._request('PUT', cls.service,
+                                           utils.urljoin(path, obj.id), call,
+                                           json=body)
+            else:
+                resp = await self._request('POST', cls.service, path, call,
+                                           json=body)
+            if cls.resource_key:
+                resp = resp[cls.resource_key]
+            return cls.existing(**resp)
+
+        return await self._observe(cls, 'create', _create)
+
+    async def update(self, cls, options):
+        obj = cls.new(**options)
+        attrs = dict(obj)
+        body = {cls.resource_key: attrs} if cls.resource_key else attrs
+
+        async def _update(call):
+            path = utils.urljoin(_base_path(cls, obj), obj.id)
+            await self._request('PATCH', cls.service, path, call, json=body)
+
+        await self._observe(cls, 'update', _update)
+
+    async def delete(self, cls, options):
+        obj = cls.new(**options)
+
+        async def _delete(call):
+            path = utils.urljoin(_base_path(cls, obj), obj.id)
+            await self._request('DELETE', cls.service, path, call)
+
+        await self._observe(cls, 'delete', _delete)
+
+    async def action(self, cls, options):
+        options = dict(options)
+        name = options.pop('action')
+        args = dict(options.pop('action_args', None) or {})
+        session = args['session'] = _RecordingSession()
+        obj = cls.new(**options)
+
+        async def _action(call):
+            result = client.invoke_action(obj, name, args)
+            if not session.requests:
+                return result
+            if len(session.requests) > 1 or result is not _PENDING:
+                raise NotImplementedError('Action %s of %s is not supported '
+                                          'asynchronously' %
+                                          (name, cls.__name__))
+            method, path, kwargs = session.requests[0]
+            return await self._request(method, kwargs['service'], path, call,
+                                       params=kwargs.get('params'),
+                                       json=kwargs.get('json'))
+
+        return await self._observe(cls, 'action', _action, detail=name)
+
+    def close(self):
+        '''Close the idle connections.'''
+        self.http.close()
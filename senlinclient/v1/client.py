@@ -10,19 +10,198 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import contextlib
+import functools
 import inspect
 import json
+import logging
+import random
+import sys
+import threading
+import time
+import timeit
+import uuid
+
+import six
 
 from openstack.identity import identity_service
 from openstack.network.v2 import thin as thins
 from openstack import transport as trans
+from openstack import utils
+from senlinclient.common import cache
 from senlinclient.common import exc as client_exc
+from senlinclient.common import hooks as client_hooks
+from senlinclient.common import sdk
+from senlinclient.v1 import models
+
+LOG = logging.getLogger(__name__)
+
+#: Statuses of an action that won't change anymore
+ACTION_TERMINAL_STATUSES = ('SUCCEEDED', 'FAILED', 'CANCELLED')
+
+
+def read_ahead(iterable, depth):
+    '''Iterate over an iterable from a background thread.
+
+    Up to `depth` items are retrieved ahead of the consumer, so that the
+    retrieval of the next items overlaps with the processing of the current
+    one. Exceptions raised by the iterable are re-raised to the consumer.
+    '''
+    items = six.moves.queue.Queue(maxsize=depth)
+    stopped = threading.Event()
+    done = object()
+
+    def _put(item):
+        while not stopped.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except six.moves.queue.Full:
+                pass
+        return False
+
+    def _produce():
+        try:
+            for item in iterable:
+                if not _put((item, None)):
+                    return
+            _put((done, None))
+        except Exception:
+            _put((None, sys.exc_info()))
+
+    producer = threading.Thread(target=_produce)
+    producer.daemon = True
+    producer.start()
+    try:
+        while True:
+            item, error = items.get()
+            if error is not None:
+                six.reraise(*error)
+            if item is done:
+                return
+            yield item
+    finally:
+        # Let the producer go if the consumer stops early
+        stopped.set()
+
+
+def backoff_intervals(interval=1, max_interval=30, backoff=2.0, jitter=0.2):
+    '''Generate the delays between successive polls.
+
+    Delays grow exponentially from `interval` up to `max_interval`, each one
+    randomly shortened by up to `jitter` times its length so that clients
+    started together don't poll in lockstep.
+    '''
+    while True:
+        yield interval * (1 - random.random() * jitter)
+        interval = min(interval * backoff, max_interval)
+
+
+def observed(verb, lazy=False, detail=None):
+    '''Make a client method call the request hooks of the client.
+
+    :param verb: The verb reported to the hooks.
+    :param lazy: Whether the method returns an iterator retrieving objects
+                 as it is consumed, in which case the call ends when the
+                 iterator is exhausted.
+    :param detail: A function returning the detail of the call from the
+                   arguments of the method, following the resource class.
+    '''
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, cls, *args, **kwargs):
+            if not self.hooks:
+                return method(self, cls, *args, **kwargs)
+
+            call = client_hooks.RequestCall(
+                cls.__name__, verb, detail and detail(*args, **kwargs))
+            self._run_hooks('before_request', call)
+            with self._measuring(call):
+                try:
+                    result = method(self, cls, *args, **kwargs)
+                except Exception as ex:
+                    self._run_hooks('on_error', call, ex)
+                    raise
+            if lazy and result is not None:
+                return self._observe_iter(call, result)
+            self._run_hooks('after_request', call)
+            return result
+        return wrapper
+    return decorator
+
+
+def invoke_action(obj, name, args):
+    '''Call an action method of a resource, e.g. scale_out.
+
+    :param args: A dict of arguments, including the session, only the ones
+                 accepted by the method are passed.
+    '''
+    action = getattr(obj, name)
+    expected_args = inspect.getargspec(action).args
+    accepted_args = ([a for a in expected_args if a != 'self'])
+    return action(**dict((d, args[d]) for d in accepted_args))
 
 
 class Client(object):
-    def __init__(self, session):
+    def __init__(self, session, name_cache=None, http_cache=None,
+                 hooks=None):
+        '''Create a client.
+
+        :param hooks: A list of :class:`hooks.RequestHook` called around
+                      the list, get, create, update, delete and action
+                      calls.
+        '''
         self.session = session
         self.auth = session.authenticator
+        self.name_cache = name_cache or cache.NameCache()
+        self.http_cache = http_cache
+        self.hooks = list(hooks or [])
+        self._project_id = None
+
+    def add_hook(self, hook):
+        '''Add a :class:`hooks.RequestHook` called around API calls.'''
+        self.hooks.append(hook)
+
+    def _run_hooks(self, name, call, *args):
+        for hook in self.hooks:
+            try:
+                getattr(hook, name)(call, *args)
+            except Exception:
+                LOG.exception('Request hook %s failed', name)
+
+    @contextlib.contextmanager
+    def _measuring(self, call):
+        '''Add the time and bytes transferred in a block to a call.'''
+        transport = getattr(self.session, 'transport', None)
+        counting = getattr(transport, 'counting', None)
+        start = timeit.default_timer()
+        try:
+            if counting is None:
+                yield
+            else:
+                with counting(call):
+                    yield
+        finally:
+            call.seconds += timeit.default_timer() - start
+
+    def _observe_iter(self, call, iterable):
+        iterator = iter(iterable)
+        try:
+            while True:
+                with self._measuring(call):
+                    try:
+                        obj = next(iterator)
+                    except StopIteration:
+                        break
+                    except Exception as ex:
+                        self._run_hooks('on_error', call, ex)
+                        raise
+                yield obj
+        except GeneratorExit:
+            # Dropped by the caller before the end, which ends the call too
+            self._run_hooks('after_request', call)
+            raise
+        self._run_hooks('after_request', call)
 
     def get_options(self, options):
         return json.loads(options)
@@ -54,18 +233,295 @@ class Client(object):
         print(self.auth.authorize(xport))
         return xport
 
+    @observed('list', lazy=True)
     def list(self, cls, **options):
         try:
             return cls.list(self.session, **options)
         except Exception as ex:
             client_exc.parse_exception(ex)
 
+    @observed('list', lazy=True)
     def list_short(self, cls, options=None):
         try:
             return cls.list_short(self.session, path_args=None, **options)
         except Exception as ex:
             client_exc.parse_exception(ex)
 
+    @observed('list', lazy=True)
+    def list_compact(self, cls, fields, options=None):
+        try:
+            return cls.list_compact(self.session, fields, path_args=None,
+                                    **(options or {}))
+        except Exception as ex:
+            client_exc.parse_exception(ex)
+
+    @observed('list')
+    def list_page(self, cls, limit=None, marker=None, path_args=None,
+                  fields=None, **options):
+        '''Retrieve a single page of a list as a list of objects.
+
+        :param fields: If specified, compact records with only these fields
+                       are returned instead of resource objects.
+        '''
+        return self._list_page(cls, limit=limit, marker=marker,
+                               path_args=path_args, fields=fields, **options)
+
+    def _list_page(self, cls, limit=None, marker=None, path_args=None,
+                   fields=None, **options):
+        try:
+            if fields:
+                objs = cls.list_compact(self.session, fields,
+                                        path_args=path_args, limit=limit,
+                                        marker=marker, **options)
+            else:
+                objs = cls.list_short(self.session, path_args=path_args,
+                                      limit=limit, marker=marker, **options)
+            return list(objs)
+        except Exception as ex:
+            client_exc.parse_exception(ex)
+
+    @observed('list', lazy=True)
+    def list_pages(self, cls, page_size=None, path_args=None, fields=None,
+                   **options):
+        '''Return a generator of the pages of a list.
+
+        Each page starts after the last object of the previous page. Pages
+        are requested until an empty one is returned: a page shorter than
+        `page_size` is not the last one when the server caps the page size.
+        The pages make a single call for the request hooks.
+        '''
+        return self._list_pages(cls, page_size, path_args, fields, options)
+
+    def _list_pages(self, cls, page_size, path_args, fields, options):
+        marker = options.pop('marker', None)
+        options.pop('limit', None)
+        while True:
+            page = self._list_page(cls, limit=page_size, marker=marker,
+                                   path_args=path_args, fields=fields,
+                                   **options) or []
+            if not page:
+                return
+            yield page
+            marker = page[-1].id
+
+    def list_all(self, cls, page_size=None, prefetch=0, path_args=None,
+                 fields=None, **options):
+        '''Return a generator that walks through all pages of a list.
+
+        By default, pages are only requested when the previous one has been
+        consumed. With `prefetch`, the following pages are requested from a
+        background thread while the caller consumes the current one.
+
+        :param page_size: Maximum number of objects requested per page. If
+                          not specified, the server decides the page size.
+        :param prefetch: Number of pages to retrieve ahead of the caller.
+        :param fields: If specified, compact records with only these fields
+                       are returned instead of resource objects.
+        '''
+        pages = self.list_pages(cls, page_size=page_size, path_args=path_args,
+                                fields=fields, **options)
+        if prefetch:
+            pages = read_ahead(pages, prefetch)
+
+        for page in pages:
+            for obj in page:
+                yield obj
+
+    def wait_for_action(self, action_id, timeout=None, interval=1,
+                        max_interval=30, backoff=2.0, jitter=0.2):
+        '''Wait for an action to reach a terminal status.
+
+        The action is polled with exponential backoff, see
+        :func:`backoff_intervals` for the meaning of the delay parameters.
+
+        :param action_id: ID of the action to wait for.
+        :param timeout: Maximum number of seconds to wait, None means
+                        waiting forever.
+        :returns: The action, its status is one of
+                  `ACTION_TERMINAL_STATUSES`.
+        :raises: `ActionTimeout` if the action is still not completed after
+                 `timeout` seconds.
+        '''
+        deadline = None if timeout is None else time.time() + timeout
+        delays = backoff_intervals(interval, max_interval, backoff, jitter)
+        while True:
+            action = self.get(models.Action, {'id': action_id})
+            if action.status in ACTION_TERMINAL_STATUSES:
+                return action
+
+            delay = next(delays)
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    msg = ('Action %(id)s is still %(status)s after '
+                           '%(timeout)s seconds' %
+                           {'id': action_id, 'status': action.status,
+                            'timeout': timeout})
+                    raise client_exc.ActionTimeout(msg)
+                delay = min(delay, remaining)
+            time.sleep(delay)
+
+    #: Maximum number of IDs filtered on by a list request, each one adds
+    #: about 40 bytes to the request line, which servers usually limit to
+    #: 8 KB
+    MAX_IDS_PER_REQUEST = 50
+
+    def wait_for_actions(self, action_ids, timeout=None, interval=1,
+                         max_interval=30, backoff=2.0, jitter=0.2):
+        '''Wait for many actions, yielding them as they complete.
+
+        Instead of polling each action, the pending actions are refreshed
+        with one list request per poll for every MAX_IDS_PER_REQUEST
+        actions. Actions missing from the lists, e.g. because the server
+        doesn't support filtering on IDs, are retrieved one by one. The
+        parameters have the same meaning as in :meth:`wait_for_action`.
+
+        :returns: A generator of the actions in completion order.
+        :raises: `ActionTimeout` if some actions are still not completed
+                 after `timeout` seconds.
+        '''
+        pending = set(action_ids)
+        deadline = None if timeout is None else time.time() + timeout
+        delays = backoff_intervals(interval, max_interval, backoff, jitter)
+        while pending:
+            ids = sorted(pending)
+            actions = {}
+            for start in range(0, len(ids), self.MAX_IDS_PER_REQUEST):
+                batch = ids[start:start + self.MAX_IDS_PER_REQUEST]
+                actions.update((a.id, a) for a in self.list_page(
+                    models.Action, limit=len(batch), id=batch) or [])
+            for action_id in ids:
+                action = actions.get(action_id)
+                if action is None:
+                    action = self.get(models.Action, {'id': action_id})
+                if action.status in ACTION_TERMINAL_STATUSES:
+                    pending.discard(action_id)
+                    yield action
+            if not pending:
+                return
+
+            delay = next(delays)
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    msg = ('%(count)s action(s) still not completed after '
+                           '%(timeout)s seconds: %(ids)s' %
+                           {'count': len(pending), 'timeout': timeout,
+                            'ids': ', '.join(sorted(pending))})
+                    raise client_exc.ActionTimeout(msg)
+                delay = min(delay, remaining)
+            time.sleep(delay)
+
+    def _get_project_id(self):
+        if self._project_id is None:
+            self._project_id = sdk.get_project_id(self.session)
+        return self._project_id
+
+    def resolve_id(self, cls, name_or_id):
+        '''Return the ID of a resource given its name or ID.
+
+        UUIDs are returned as is. Names are looked up on the server the first
+        time and then served from the name cache, which is per project.
+        '''
+        try:
+            uuid.UUID(name_or_id)
+            return name_or_id
+        except ValueError:
+            pass
+
+        project = self._get_project_id()
+        if project is None:
+            return self.get(cls, {'id': name_or_id}).id
+
+        obj_id = self.name_cache.get(cls.__name__, project, name_or_id)
+        if obj_id is None:
+            obj_id = self.get(cls, {'id': name_or_id}).id
+            self.name_cache.put(cls.__name__, project, name_or_id, obj_id)
+        return obj_id
+
+    def _http_cache_prefix(self):
+        return '%s ' % self._get_project_id()
+
+    def _invalidate(self, cls, name_or_id):
+        project = self._get_project_id()
+        if project is not None and name_or_id:
+            self.name_cache.invalidate(cls.__name__, project, name_or_id)
+        if self.http_cache is not None and name_or_id:
+            url = self._http_cache_prefix() + utils.urljoin(cls.base_path,
+                                                            name_or_id)
+            self.http_cache.delete(url)
+
+    def list_changes(self, cls, since, page_size=50, path_args=None,
+                     time_keys=('updated_time', 'created_time'), **options):
+        '''Return a generator of the objects changed since a time.
+
+        For each time key, the list is sorted on that key in descending order
+        and pages are only requested until an object older than `since` is
+        found, so that unchanged objects are usually not downloaded. Objects
+        changed at `since` exactly are returned again. Objects without a time
+        are skipped when listed first, as NULL values are on PostgreSQL, and
+        end the list when found after objects with a time, as on MySQL.
+
+        :param since: Timestamp, in the format used by the server.
+        :param time_keys: Attributes holding the times of changes, objects
+                          that have never been updated can only be found by
+                          their creation time.
+        '''
+        seen = set()
+        for key in time_keys:
+            for obj in self._list_changed(cls, since, key, page_size,
+                                          path_args, options):
+                if obj.id not in seen:
+                    seen.add(obj.id)
+                    yield obj
+
+    def _list_changed(self, cls, since, key, page_size, path_args, options):
+        pages = self.list_pages(cls, page_size=page_size, path_args=path_args,
+                                sort_keys=key, sort_dir='desc', **options)
+        timed = False
+        nulls_first = None
+        for page in pages:
+            for obj in page:
+                timestamp = getattr(obj, key)
+                if timestamp is None and not timed:
+                    # Either NULL values sort first or no object has a time,
+                    # in which case the first one in ascending order has none
+                    if nulls_first is None:
+                        first = self.list_page(cls, limit=1,
+                                               path_args=path_args,
+                                               sort_keys=key, sort_dir='asc',
+                                               **options) or []
+                        nulls_first = bool(first and getattr(first[0], key))
+                    if not nulls_first:
+                        return
+                    continue
+                if timestamp is None or timestamp < since:
+                    return
+                timed = True
+                yield obj
+
+    def follow(self, cls, interval=2, marker=None, sort_key='timestamp',
+               page_size=100, path_args=None, fields=None, **options):
+        '''Return an endless generator of objects as they are created.
+
+        Objects are listed in ascending `sort_key` order, starting after the
+        `marker`. Each poll only requests the objects after the last one
+        returned. None is yielded each time the existing objects have all
+        been returned, before waiting `interval` seconds for new ones.
+        '''
+        while True:
+            pages = self.list_pages(cls, page_size=page_size,
+                                    path_args=path_args, marker=marker,
+                                    sort_keys=sort_key, sort_dir='asc',
+                                    fields=fields, **options)
+            for page in pages:
+                for obj in page:
+                    yield obj
+                marker = page[-1].id
+            yield None
+            time.sleep(interval)
+
+    @observed('create')
     def create(self, cls, params):
         obj = cls.new(**params)
         try:
@@ -73,31 +529,42 @@ class Client(object):
         except Exception as ex:
             client_exc.parse_exception(ex)
 
-    def get(self, cls, options=None):
+    @observed('get')
+    def get(self, cls, options=None, fields=None):
         if options is None:
             options = {}
         try:
             obj = cls.new(**options)
-            return obj.get(self.session)
+            if self.http_cache is not None:
+                return obj.get_cached(self.session, self.http_cache,
+                                      key_prefix=self._http_cache_prefix(),
+                                      fields=fields)
+            return obj.get(self.session, fields=fields)
         except Exception as ex:
             client_exc.parse_exception(ex)
 
     def find(self, cls, options):
         return cls.find(self.session, options)
 
+    @observed('update')
     def update(self, cls, options):
         obj = cls.new(**options)
         try:
             obj.update(self.session)
         except Exception as ex:
             client_exc.parse_exception(ex)
+        finally:
+            self._invalidate(cls, options.get('id'))
 
+    @observed('delete')
     def delete(self, cls, options):
         obj = cls.new(**options)
         try:
             obj.delete(self.session)
         except Exception as ex:
             client_exc.parse_exception(ex)
+        finally:
+            self._invalidate(cls, options.get('id'))
 
     def head(self, cls, options):
         kwargs = self.get_options(options)
@@ -105,19 +572,8 @@ class Client(object):
         obj.head(self.session)
         return obj
 
+    @observed('action', detail=lambda options: options.get('action'))
     def action(self, cls, options):
-        def filter_args(method, params):
-            expected_args = inspect.getargspec(method).args
-            accepted_args = ([a for a in expected_args if a != 'self'])
-            filtered_args = dict((d, params[d]) for d in accepted_args)
-            return filtered_args
-
-        def invoke_method(target, method_name, params):
-            action = getattr(target, method_name)
-            filtered_args = filter_args(action, params)
-            reply = action(**filtered_args)
-            return reply
-
         action = options.pop('action')
         if 'action_args' in options:
             args = options.pop('action_args')
@@ -127,6 +583,6 @@ class Client(object):
         args.update(session=self.session)
         obj = cls.new(**options)
         try:
-            return invoke_method(obj, action, args)
+            return invoke_action(obj, action, args)
         except Exception as ex:
             client_exc.parse_exception(ex)
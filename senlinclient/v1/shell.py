@@ -10,17 +10,241 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import collections
+import datetime
+import itertools
 import logging
+import sys
+import time
 
-from oslo_serialization import jsonutils
+import six
 
 from senlinclient.common import exc
 from senlinclient.common.i18n import _
+from senlinclient.common import serialization
 from senlinclient.common import utils
 from senlinclient.v1 import models
 
 logger = logging.getLogger(__name__)
 
+#: Minimum number of seconds between two polls of the watch commands
+WATCH_MIN_INTERVAL = 1.0
+#: Number of seconds between two listings of all the IDs by the watch
+#: commands, for finding the deleted objects
+WATCH_SWEEP_INTERVAL = 60.0
+
+
+def _delete_resources(sc, cls, ids, parallel=1, **params):
+    '''Delete resources, using up to `parallel` concurrent requests.
+
+    :returns: A list of (id, exception) tuples for the resources that were
+              not found.
+    '''
+    def _delete(rid):
+        query = {'id': rid}
+        query.update(params)
+        try:
+            sc.delete(cls, query)
+        except exc.HTTPNotFound as ex:
+            return ex
+        return None
+
+    results = utils.parallel_map(_delete, ids, parallel)
+    return [(rid, ex) for rid, ex in zip(ids, results) if ex is not None]
+
+
+def _print_delete_summary(failures, ids):
+    if failures:
+        print(_('%(failed)s of %(total)s deletion(s) failed.') % {
+            'failed': len(failures), 'total': len(ids)})
+
+
+def _wait_args(func):
+    '''Add the options for waiting on the action started by a command.'''
+    utils.arg('--wait-timeout', metavar='<SECONDS>', type=float,
+              help=_('Maximum number of seconds to wait with --wait. '
+                     'Default to wait forever.'))(func)
+    utils.arg('--wait', default=False, action="store_true",
+              help=_('Wait for the action to complete.'))(func)
+    return func
+
+
+def _handle_action(sc, args, action_id):
+    '''Report an accepted action and wait for it if requested.'''
+    print('Request accepted by action %s' % action_id)
+    if not args.wait:
+        return
+
+    try:
+        action = sc.wait_for_action(action_id, timeout=args.wait_timeout)
+    except exc.ActionTimeout as ex:
+        raise exc.CommandError(six.text_type(ex))
+
+    _print_action_result(action)
+    if action.status != 'SUCCEEDED':
+        raise exc.CommandError(_('Action %s did not succeed') % action_id)
+
+
+def _print_action_result(action):
+    print('Action %(id)s %(status)s: %(reason)s' %
+          {'id': action.id, 'status': action.status,
+           'reason': action.status_reason})
+
+
+def _watch(sc, cls, args, fields, ids=None, **queries):
+    '''Print objects once, then print their changes until interrupted.
+
+    Deleted objects are found by requesting each watched object after every
+    poll for changes when IDs are given. Otherwise all the objects are
+    listed every WATCH_SWEEP_INTERVAL seconds, and the known ones missing
+    from that listing are reported as deleted.
+
+    :param fields: Attributes compared to detect changes.
+    :param ids: IDs of the objects to watch, all listed objects if None.
+    '''
+    def _changed_time(obj):
+        return obj.updated_time or obj.created_time or ''
+
+    def _snapshot(obj):
+        return dict((f, getattr(obj, f, None)) for f in fields)
+
+    def _report(obj, old):
+        new = _snapshot(obj)
+        if old is None:
+            changes = ['%s %s' % (f, new[f]) for f in fields]
+            verb = 'appeared'
+        else:
+            changes = ['%s %s -> %s' % (f, old[f], new[f]) for f in fields
+                       if old[f] != new[f]]
+            verb = 'changed'
+        if changes:
+            print('%(time)s %(id)s %(verb)s: %(changes)s' %
+                  {'time': _changed_time(obj), 'id': obj.id, 'verb': verb,
+                   'changes': ', '.join(changes)})
+            sys.stdout.flush()
+        return new
+
+    def _deleted(poll):
+        if ids is not None:
+            missing = []
+            for obj_id in sorted(known):
+                try:
+                    sc.get(cls, {'id': obj_id})
+                except exc.HTTPNotFound:
+                    missing.append(obj_id)
+            return missing
+        if poll % sweep_polls:
+            return []
+        existing = set(o.id for o in sc.list_all(cls, fields=['id'],
+                                                 **queries))
+        return sorted(set(known) - existing)
+
+    interval = max(args.interval, WATCH_MIN_INTERVAL)
+    sweep_polls = max(1, int(round(WATCH_SWEEP_INTERVAL / interval)))
+    objs = [o for o in sc.list_all(cls, **queries)
+            if ids is None or o.id in ids]
+    known = dict((o.id, _snapshot(o)) for o in objs)
+    since = max([_changed_time(o) for o in objs] or [''])
+    utils.print_list(objs, ['id'] + fields, sortby_index=1)
+    sys.stdout.flush()
+
+    try:
+        for poll in itertools.count(1):
+            time.sleep(interval)
+            for obj in sc.list_changes(cls, since, **queries):
+                if ids is not None and obj.id not in ids:
+                    continue
+                known[obj.id] = _report(obj, known.get(obj.id))
+                since = max(since, _changed_time(obj))
+
+            deleted = _deleted(poll)
+            if deleted:
+                now = datetime.datetime.utcnow().replace(microsecond=0)
+                for obj_id in deleted:
+                    del known[obj_id]
+                    print('%s %s deleted' % (now.isoformat(), obj_id))
+                sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+
+
+def _fields_arg(func):
+    '''Add the option for selecting the fields shown by a command.'''
+    utils.arg('--fields', metavar='<FIELD1,FIELD2...>',
+              help=_('Comma separated list of the fields to retrieve and '
+                     'show. Default to the usual fields.'))(func)
+    return func
+
+
+def _list_args(noun):
+    '''Return a decorator adding the options of a command listing nouns.
+
+    :param noun: Plural name of the listed objects, e.g. 'nodes'.
+    '''
+    def decorator(func):
+        utils.arg('--format', metavar='<FORMAT>', default='table',
+                  choices=utils.list_formats,
+                  help=_('Output format, one of: %s. Default to table. '
+                         'Formats other than table print rows as they are '
+                         'received, without sorting them, and print full '
+                         'IDs.') % ', '.join(utils.list_formats))(func)
+        utils.arg('--prefetch', metavar='<DEPTH>', type=int, default=0,
+                  help=_('Number of pages to retrieve in the background '
+                         'ahead of the one being processed when --all is '
+                         'specified. Default to 0.'))(func)
+        utils.arg('--page-size', metavar='<SIZE>', type=int,
+                  help=_('Number of %s retrieved per request when --all is '
+                         'specified. Default to the value of --limit if '
+                         'given.') % noun)(func)
+        utils.arg('-a', '--all', default=False, action="store_true",
+                  help=_('Retrieve all %s page by page, starting after the '
+                         'marker if any.') % noun)(func)
+        return func
+    return decorator
+
+
+def _full_id(args):
+    '''Return whether a list command prints full IDs.
+
+    Formats other than table are meant to be parsed, they always get them.
+    '''
+    return args.full_id or args.format != 'table'
+
+
+def _select_fields(args, cls, default=None):
+    '''Return the fields selected with --fields, or the default ones.'''
+    if not args.fields:
+        return default
+
+    fields = [f.strip() for f in args.fields.split(',') if f.strip()]
+    unknown = sorted(set(fields) - cls.field_names())
+    if unknown:
+        msg = _('Unknown field(s): %s') % ', '.join(unknown)
+        raise exc.CommandError(msg)
+    return fields
+
+
+def _prune(d, fields):
+    '''Only keep the selected fields, if any, of a dict to print.'''
+    if not fields:
+        return d
+    return dict((k, v) for k, v in d.items() if k in fields)
+
+
+def _list(sc, cls, args, fields=None, **queries):
+    '''List a page of resources, or all of them if --all is specified.
+
+    When fields are given, compact records holding only these fields are
+    listed instead of full resources.
+    '''
+    limit = queries.pop('limit', None)
+    if not args.all:
+        marker = queries.pop('marker', None)
+        return sc.list_page(cls, limit=limit, marker=marker, fields=fields,
+                            **queries)
+    return sc.list_all(cls, page_size=args.page_size or limit,
+                       prefetch=args.prefetch, fields=fields, **queries)
+
 
 def do_build_info(sc, args):
     '''Retrieve build information.'''
@@ -52,7 +276,7 @@ def do_profile_type_show(sc, args):
         raise exc.CommandError(
             _('Profile Type not found: %s') % args.profile_type)
     else:
-        print(jsonutils.dumps(profile_type, indent=2))
+        print(serialization.dumps(profile_type, indent=2))
 
 
 @utils.arg('profile_type', metavar='<PROFILE_TYPE>',
@@ -80,6 +304,8 @@ def do_profile_type_schema(sc, args):
 #### PROFILES
 
 
+@_fields_arg
+@_list_args('profiles')
 @utils.arg('-d', '--show-deleted', default=False, action="store_true",
            help=_('Include soft-deleted profiles if any.'))
 @utils.arg('-l', '--limit', metavar='<LIMIT>',
@@ -93,26 +319,30 @@ def do_profile_list(sc, args=None):
     def _short_id(obj):
         return obj.id[:8] + ' ...'
 
-    fields = ['id', 'name', 'type', 'permission', 'created_time']
+    fields = _select_fields(args, models.Profile,
+                            ['id', 'name', 'type', 'permission',
+                             'created_time'])
     queries = {
         'show_deleted': args.show_deleted,
         'limit': args.limit,
         'marker': args.marker,
     }
 
-    profiles = sc.list(models.Profile, **queries)
+    profiles = _list(sc, models.Profile, args, fields=fields, **queries)
     formatters = {}
-    if not args.full_id:
+    if not _full_id(args):
         formatters = {
             'id': _short_id,
         }
-    utils.print_list(profiles, fields, formatters=formatters, sortby_index=1)
+    utils.print_list(profiles, fields, formatters=formatters,
+                     sortby_index=0 if args.fields else 1,
+                     output_format=args.format, stream=args.all)
 
 
-def _show_profile(sc, profile_id):
+def _show_profile(sc, profile_id, fields=None):
     try:
         params = {'id': profile_id}
-        profile = sc.get(models.Profile, params)
+        profile = sc.get(models.Profile, params, fields=fields)
     except exc.HTTPNotFound:
         raise exc.CommandError(_('Profile not found: %s') % profile_id)
 
@@ -126,7 +356,7 @@ def _show_profile(sc, profile_id):
              'template', 'timeout'],
             ['property', 'value'])
 
-    utils.print_dict(profile.to_dict(), formatters=formatters)
+    utils.print_dict(_prune(profile.to_dict(), fields), formatters=formatters)
 
 
 @utils.arg('-t', '--profile-type', metavar='<TYPE NAME>', required=True,
@@ -159,11 +389,13 @@ def do_profile_create(sc, args):
     _show_profile(sc, profile.id)
 
 
+@_fields_arg
 @utils.arg('id', metavar='<PROFILE>',
            help=_('Name or ID of profile to show.'))
 def do_profile_show(sc, args):
     '''Show the profile details.'''
-    _show_profile(sc, args.id)
+    _show_profile(sc, args.id,
+                  fields=_select_fields(args, models.Profile))
 
 
 @utils.arg('-n', '--name', metavar='<NAME>',
@@ -193,38 +425,34 @@ def do_profile_update(sc, args):
         'tags': utils.format_parameters(args.tags),
     }
 
-    # Find the profile first, we need its id
+    # Find the profile first, we need its id. An ID is resolved without a
+    # request, so the update itself can find the profile missing too.
     try:
-        profile = sc.get(models.Profile, {'id': args.id})
+        profile_id = sc.resolve_id(models.Profile, args.id)
+        params['id'] = profile_id
+        sc.update(models.Profile, params)
     except exc.HTTPNotFound:
         raise exc.CommandError(_('Profile not found: %s') % args.id)
-
-    params['id'] = profile.id
-    sc.update(models.Profile, params)
-    _show_profile(sc, args.id)
+    _show_profile(sc, profile_id)
 
 
 @utils.arg('-f', '--force', default=False, action="store_true",
            help=_('Delete the profile completely from database.'))
+@utils.arg('--parallel', metavar='<N>', type=int, default=1,
+           help=_('Number of deletion requests to send concurrently. '
+                  'Default to 1.'))
 @utils.arg('id', metavar='<PROFILE>', nargs='+',
            help=_('Name or ID of profile(s) to delete.'))
 def do_profile_delete(sc, args):
     '''Delete profile(s).'''
-    failure_count = 0
-
-    for cid in args.id:
-        try:
-            query = {
-                'id': cid,
-                'force': args.force
-            }
-            sc.delete(models.Profile, query)
-        except exc.HTTPNotFound as ex:
-            failure_count += 1
-            print(ex)
-    if failure_count == len(args.id):
+    failures = _delete_resources(sc, models.Profile, args.id,
+                                 parallel=args.parallel, force=args.force)
+    for cid, ex in failures:
+        print(ex)
+    if len(failures) == len(args.id):
         msg = _('Failed to delete any of the specified profile(s).')
         raise exc.CommandError(msg)
+    _print_delete_summary(failures, args.id)
     print('Profile deleted: %s' % args.id)
 
 
@@ -248,7 +476,7 @@ def do_policy_type_show(sc, args):
         raise exc.CommandError(
             _('Policy Type not found: %s') % args.policy_type)
     else:
-        print(jsonutils.dumps(policy_type, indent=2))
+        print(serialization.dumps(policy_type, indent=2))
 
 
 @utils.arg('policy_type', metavar='<POLICY_TYPE>',
@@ -276,6 +504,8 @@ def do_policy_type_schema(sc, args):
 #### POLICIES
 
 
+@_fields_arg
+@_list_args('policies')
 @utils.arg('-d', '--show-deleted', default=False, action="store_true",
            help=_('Include soft-deleted policies if any.'))
 @utils.arg('-l', '--limit', metavar='<LIMIT>',
@@ -289,27 +519,31 @@ def do_policy_list(sc, args=None):
     def _short_id(obj):
         return obj.id[:8] + ' ...'
 
-    fields = ['id', 'name', 'type', 'level', 'cooldown', 'created_time']
+    fields = _select_fields(args, models.Policy,
+                            ['id', 'name', 'type', 'level', 'cooldown',
+                             'created_time'])
     queries = {
         'show_deleted': args.show_deleted,
         'limit': args.limit,
         'marker': args.marker,
     }
 
-    policies = sc.list(models.Policy, **queries)
+    policies = _list(sc, models.Policy, args, fields=fields, **queries)
     formatters = {}
-    if not args.full_id:
+    if not _full_id(args):
         formatters = {
             'id': _short_id,
         }
-    utils.print_list(policies, fields, formatters=formatters, sortby_index=1)
+    utils.print_list(policies, fields, formatters=formatters,
+                     sortby_index=0 if args.fields else 1,
+                     output_format=args.format, stream=args.all)
 
 
-def _show_policy(sc, policy_id=None, policy=None):
+def _show_policy(sc, policy_id=None, policy=None, fields=None):
     if policy is None:
         try:
             params = {'id': policy_id}
-            policy = sc.get(models.Policy, params)
+            policy = sc.get(models.Policy, params, fields=fields)
         except exc.HTTPNotFound:
             raise exc.CommandError(_('Policy not found: %s') % policy_id)
 
@@ -317,7 +551,7 @@ def _show_policy(sc, policy_id=None, policy=None):
         'tags': utils.json_formatter,
         'spec': utils.json_formatter,
     }
-    utils.print_dict(policy.to_dict(), formatters=formatters)
+    utils.print_dict(_prune(policy.to_dict(), fields), formatters=formatters)
 
 
 @utils.arg('-t', '--policy-type', metavar='<TYPE_NAME>', required=True,
@@ -347,11 +581,13 @@ def do_policy_create(sc, args):
     _show_policy(sc, policy=policy)
 
 
+@_fields_arg
 @utils.arg('id', metavar='<POLICY>',
            help=_('Name of the policy to be updated.'))
 def do_policy_show(sc, args):
     '''Show the policy details.'''
-    _show_policy(sc, policy_id=args.id)
+    _show_policy(sc, policy_id=args.id,
+                 fields=_select_fields(args, models.Policy))
 
 
 @utils.arg('-c', '--cooldown', metavar='<SECONDS>',
@@ -372,40 +608,38 @@ def do_policy_update(sc, args):
         'level': args.enforcement_level,
     }
 
-    policy = sc.get(models.Policy, {'id': args.id})
-    if policy is not None:
-        params['id'] = policy.id
+    policy_id = sc.resolve_id(models.Policy, args.id)
+    if policy_id is not None:
+        params['id'] = policy_id
         sc.update(models.Policy, params)
-        _show_policy(sc, policy_id=policy.id)
+        _show_policy(sc, policy_id=policy_id)
 
 
 @utils.arg('-f', '--force', default=False, action="store_true",
            help=_('Delete the policy completely from database.'))
+@utils.arg('--parallel', metavar='<N>', type=int, default=1,
+           help=_('Number of deletion requests to send concurrently. '
+                  'Default to 1.'))
 @utils.arg('id', metavar='<POLICY>', nargs='+',
            help=_('Name or ID of policy(s) to delete.'))
 def do_policy_delete(sc, args):
     '''Delete policy(s).'''
-    failure_count = 0
-
-    for cid in args.id:
-        try:
-            query = {
-                'id': cid,
-                'force': args.force
-            }
-            sc.delete(models.Policy, query)
-        except exc.HTTPNotFound as ex:
-            failure_count += 1
-            print(ex)
-    if failure_count == len(args.id):
+    failures = _delete_resources(sc, models.Policy, args.id,
+                                 parallel=args.parallel, force=args.force)
+    for cid, ex in failures:
+        print(ex)
+    if len(failures) == len(args.id):
         msg = _('Failed to delete any of the specified policy(s).')
         raise exc.CommandError(msg)
+    _print_delete_summary(failures, args.id)
     print('Policy deleted: %s' % args.id)
 
 
 #### CLUSTERS
 
 
+@_fields_arg
+@_list_args('clusters')
 @utils.arg('-s', '--show-deleted', default=False, action="store_true",
            help=_('Include soft-deleted clusters if any.'))
 @utils.arg('-n', '--show-nested', default=False, action="store_true",
@@ -431,7 +665,8 @@ def do_cluster_list(sc, args=None):
     def _short_id(obj):
         return obj.id[:8] + ' ...'
 
-    fields = ['id', 'name', 'status', 'created_time']
+    fields = _select_fields(args, models.Cluster,
+                            ['id', 'name', 'status', 'created_time'])
     queries = {
         'limit': args.limit,
         'marker': args.marker,
@@ -439,22 +674,24 @@ def do_cluster_list(sc, args=None):
         'show_deleted': args.show_deleted,
         'show_nested': args.show_nested
     }
-    if args.show_nested:
+    if args.show_nested and not args.fields:
         fields.append('parent')
 
-    clusters = sc.list(models.Cluster, **queries)
+    clusters = _list(sc, models.Cluster, args, fields=fields, **queries)
     formatters = {}
-    if not args.full_id:
+    if not _full_id(args):
         formatters = {
             'id': _short_id,
         }
-    utils.print_list(clusters, fields, formatters=formatters, sortby_index=3)
+    utils.print_list(clusters, fields, formatters=formatters,
+                     sortby_index=0 if args.fields else 3,
+                     output_format=args.format, stream=args.all)
 
 
-def _show_cluster(sc, cluster_id):
+def _show_cluster(sc, cluster_id, fields=None):
     try:
         query = {'id': cluster_id}
-        cluster = sc.get(models.Cluster, query)
+        cluster = sc.get(models.Cluster, query, fields=fields)
     except exc.HTTPNotFound:
         raise exc.CommandError(_('Cluster %s is not found') % cluster_id)
 
@@ -462,7 +699,7 @@ def _show_cluster(sc, cluster_id):
         'tags': utils.json_formatter,
         'nodes': utils.list_formatter,
     }
-    utils.print_dict(cluster.to_dict(), formatters=formatters)
+    utils.print_dict(_prune(cluster.to_dict(), fields), formatters=formatters)
 
 
 @utils.arg('-p', '--profile', metavar='<PROFILE>', required=True,
@@ -495,22 +732,21 @@ def do_cluster_create(sc, args):
     _show_cluster(sc, cluster.id)
 
 
+@utils.arg('--parallel', metavar='<N>', type=int, default=1,
+           help=_('Number of deletion requests to send concurrently. '
+                  'Default to 1.'))
 @utils.arg('id', metavar='<CLUSTER>', nargs='+',
            help=_('Name or ID of cluster(s) to delete.'))
 def do_cluster_delete(sc, args):
     '''Delete the cluster(s).'''
-    failure_count = 0
-
-    for cid in args.id:
-        try:
-            query = {'id': cid}
-            sc.delete(models.Cluster, query)
-        except exc.HTTPNotFound as ex:
-            failure_count += 1
-            print(ex)
-    if failure_count == len(args.id):
+    failures = _delete_resources(sc, models.Cluster, args.id,
+                                 parallel=args.parallel)
+    for cid, ex in failures:
+        print(ex)
+    if len(failures) == len(args.id):
         msg = _('Failed to delete any of the specified clusters.')
         raise exc.CommandError(msg)
+    _print_delete_summary(failures, args.id)
 
     print('Request accepted')
 
@@ -532,9 +768,9 @@ def do_cluster_delete(sc, args):
            help=_('Name or ID of cluster to be updated.'))
 def do_cluster_update(sc, args):
     '''Update the cluster.'''
-    cluster = sc.get(models.Cluster, {'id': args.id})
+    cluster_id = sc.resolve_id(models.Cluster, args.id)
     params = {
-        'id': cluster.id,
+        'id': cluster_id,
         'name': args.name,
         'profile_id': args.profile,
         'parent': args.parent,
@@ -543,14 +779,30 @@ def do_cluster_update(sc, args):
     }
 
     sc.update(models.Cluster, params)
-    _show_cluster(sc, cluster.id)
+    _show_cluster(sc, cluster_id)
 
 
+@_fields_arg
 @utils.arg('id', metavar='<CLUSTER>',
            help=_('Name or ID of cluster to show.'))
 def do_cluster_show(sc, args):
     '''Show details of the cluster.'''
-    _show_cluster(sc, args.id)
+    _show_cluster(sc, args.id, fields=_select_fields(args, models.Cluster))
+
+
+@utils.arg('-i', '--interval', metavar='<SECONDS>', type=float, default=5,
+           help=_('Number of seconds between two checks for changes, at '
+                  'least %s. Default to 5.') % WATCH_MIN_INTERVAL)
+@utils.arg('id', metavar='<CLUSTER>', nargs='*',
+           help=_('Name or ID of the cluster(s) to watch. Default to all '
+                  'clusters.'))
+def do_cluster_watch(sc, args):
+    '''Show clusters, then their changes as they happen.'''
+    ids = None
+    if args.id:
+        ids = set(sc.resolve_id(models.Cluster, i) for i in args.id)
+    fields = ['name', 'status', 'status_reason', 'profile_id']
+    _watch(sc, models.Cluster, args, fields, ids=ids)
 
 
 @utils.arg('-s', '--show-deleted', default=False, action="store_true",
@@ -602,6 +854,7 @@ def do_cluster_node_list(sc, args):
     utils.print_list(nodes, fields, formatters=formatters, sortby_index=5)
 
 
+@_wait_args
 @utils.arg('-n', '--nodes', metavar='<NODES>', required=True,
            help=_('ID of nodes to be added; multiple nodes can be separated '
                   'with ","'))
@@ -618,9 +871,10 @@ def do_cluster_node_add(sc, args):
         }
     }
     resp = sc.action(models.Cluster, params)
-    print('Request accepted by action %s' % resp['action'])
+    _handle_action(sc, args, resp['action'])
 
 
+@_wait_args
 @utils.arg('-n', '--nodes', metavar='<NODES>', required=True,
            help=_('ID of nodes to be deleted; multiple nodes can be separated'
                   'with ",".'))
@@ -637,9 +891,10 @@ def do_cluster_node_del(sc, args):
         }
     }
     resp = sc.action(models.Cluster, params)
-    print('Request accepted by action %s' % resp['action'])
+    _handle_action(sc, args, resp['action'])
 
 
+@_wait_args
 @utils.arg('-c', '--count', metavar='<COUNT>',
            help=_('Number of nodes to be added.'))
 @utils.arg('id', metavar='<CLUSTER>',
@@ -655,9 +910,10 @@ def do_cluster_scale_out(sc, args):
     }
 
     resp = sc.action(models.Cluster, params)
-    print('Request accepted by action %s' % resp['action'])
+    _handle_action(sc, args, resp['action'])
 
 
+@_wait_args
 @utils.arg('-c', '--count', metavar='<COUNT>',
            help=_('Number of nodes to be added.'))
 @utils.arg('id', metavar='<CLUSTER>',
@@ -675,7 +931,7 @@ def do_cluster_scale_in(sc, args):
         'action_args': action_args,
     }
     resp = sc.action(models.Cluster, params)
-    print('Request accepted by action %s' % resp['action'])
+    _handle_action(sc, args, resp['action'])
 
 
 @utils.arg('-f', '--filters', metavar='<KEY1=VALUE1;KEY2=VALUE2...>',
@@ -691,8 +947,7 @@ def do_cluster_scale_in(sc, args):
            help=_('Name or ID of cluster to query on.'))
 def do_cluster_policy_list(sc, args):
     '''List policies from cluster.'''
-    query = {'id': args.id}
-    cluster = sc.get(models.Cluster, query)
+    cluster_id = sc.resolve_id(models.Cluster, args.id)
 
     queries = {
         'filters': utils.format_parameters(args.filters),
@@ -700,7 +955,7 @@ def do_cluster_policy_list(sc, args):
         'sort_dir': args.sort_dir,
     }
     policies = sc.list(models.ClusterPolicy,
-                       path_args={'cluster_id': cluster.id},
+                       path_args={'cluster_id': cluster_id},
                        **queries)
     fields = ['policy_id', 'policy', 'type', 'priority', 'level',
               'cooldown', 'enabled']
@@ -721,6 +976,7 @@ def do_cluster_policy_show(sc, args):
     utils.print_dict(binding.to_dict())
 
 
+@_wait_args
 @utils.arg('-p', '--policy', metavar='<POLICY>', required=True,
            help=_('ID or name of policy to be attached.'))
 @utils.arg('-r', '--priority', metavar='<PRIORITY>', default=50,
@@ -753,9 +1009,10 @@ def do_cluster_policy_attach(sc, args):
     }
 
     resp = sc.action(models.Cluster, params)
-    print('Request accepted by action %s' % resp['action'])
+    _handle_action(sc, args, resp['action'])
 
 
+@_wait_args
 @utils.arg('-p', '--policy', metavar='<POLICY>', required=True,
            help=_('ID or name of policy to be detached.'))
 @utils.arg('id', metavar='<NAME or ID>',
@@ -771,9 +1028,10 @@ def do_cluster_policy_detach(sc, args):
     }
 
     resp = sc.action(models.Cluster, params)
-    print('Request accepted by action %s' % resp['action'])
+    _handle_action(sc, args, resp['action'])
 
 
+@_wait_args
 @utils.arg('-p', '--policy', metavar='<POLICY>', required=True,
            help=_('ID or name of policy to be updated.'))
 @utils.arg('-r', '--priority', metavar='<PRIORITY>',
@@ -803,9 +1061,10 @@ def do_cluster_policy_update(sc, args):
     }
 
     resp = sc.action(models.Cluster, params)
-    print('Request accepted by action %s' % resp['action'])
+    _handle_action(sc, args, resp['action'])
 
 
+@_wait_args
 @utils.arg('-p', '--policy', metavar='<POLICY>', required=True,
            help=_('ID or name of policy to be enabled.'))
 @utils.arg('id', metavar='<NAME or ID>',
@@ -820,9 +1079,10 @@ def do_cluster_policy_enable(sc, args):
         }
     }
     resp = sc.action(models.Cluster, params)
-    print('Request accepted by action %s' % resp['action'])
+    _handle_action(sc, args, resp['action'])
 
 
+@_wait_args
 @utils.arg('-p', '--policy', metavar='<POLICY>', required=True,
            help=_('ID or name of policy to be disabled.'))
 @utils.arg('id', metavar='<NAME or ID>',
@@ -837,12 +1097,14 @@ def do_cluster_policy_disable(sc, args):
         }
     }
     resp = sc.action(models.Cluster, params)
-    print('Request accepted by action %s' % resp['action'])
+    _handle_action(sc, args, resp['action'])
 
 
 #### NODES
 
 
+@_fields_arg
+@_list_args('nodes')
 @utils.arg('-c', '--cluster', default=None,
            help=_('ID or name of cluster for nodes to list.'))
 @utils.arg('-s', '--show-deleted', default=False, action="store_true",
@@ -877,8 +1139,10 @@ def do_node_list(sc, args):
     def _short_physical_id(obj):
         return obj.physical_id[:8] + ' ...' if obj.physical_id else ''
 
-    fields = ['id', 'name', 'status', 'cluster_id', 'physical_id',
-              'profile_name', 'created_time', 'updated_time']
+    fields = _select_fields(args, models.Node,
+                            ['id', 'name', 'status', 'cluster_id',
+                             'physical_id', 'profile_name', 'created_time',
+                             'updated_time'])
 
     queries = {
         'show_deleted': args.show_deleted,
@@ -891,12 +1155,12 @@ def do_node_list(sc, args):
         'global_tenant': args.global_tenant,
     }
 
-    if args.show_deleted:
+    if args.show_deleted and not args.fields:
         fields.append('deleted_time')
 
-    nodes = sc.list(models.Node, **queries)
+    nodes = _list(sc, models.Node, args, fields=fields, **queries)
 
-    if not args.full_id:
+    if not _full_id(args):
         formatters = {
             'id': _short_id,
             'cluster_id': _short_cluster_id,
@@ -905,14 +1169,16 @@ def do_node_list(sc, args):
     else:
         formatters = {}
 
-    utils.print_list(nodes, fields, formatters=formatters, sortby_index=6)
+    utils.print_list(nodes, fields, formatters=formatters,
+                     sortby_index=0 if args.fields else 6,
+                     output_format=args.format, stream=args.all)
 
 
-def _show_node(sc, node_id):
+def _show_node(sc, node_id, fields=None):
     '''Show detailed info about the specified node.'''
     try:
         query = {'id': node_id}
-        node = sc.get(models.Node, query)
+        node = sc.get(models.Node, query, fields=fields)
     except exc.HTTPNotFound:
         msg = _('Node %s is not found') % node_id
         raise exc.CommandError(msg)
@@ -922,7 +1188,7 @@ def _show_node(sc, node_id):
         'data': utils.json_formatter,
     }
 
-    utils.print_dict(node.to_dict(), formatters=formatters)
+    utils.print_dict(_prune(node.to_dict(), fields), formatters=formatters)
 
 
 @utils.arg('-p', '--profile', metavar='<PROFILE>', required=True,
@@ -952,29 +1218,177 @@ def do_node_create(sc, args):
     _show_node(sc, node.id)
 
 
+#: Outcome of the creation of a node by node-create-bulk
+BulkNodeResult = collections.namedtuple('BulkNodeResult',
+                                        ['name', 'id', 'error'])
+
+
+def _load_node_manifest(path):
+    '''Read the nodes to create from a YAML or a CSV file.
+
+    A YAML manifest is a list of mappings, or a mapping with such a list
+    under 'nodes'. A CSV manifest starts with a row naming the columns.
+    '''
+    if path.lower().endswith('.csv'):
+        import csv
+        try:
+            with open(path, 'r') as f:
+                rows = list(csv.DictReader(f))
+        except (IOError, csv.Error) as ex:
+            raise exc.CommandError(six.text_type(ex))
+    else:
+        rows = utils.get_spec_content(path)
+        if isinstance(rows, dict):
+            rows = rows.get('nodes')
+
+    if not (isinstance(rows, list) and
+            all(isinstance(row, dict) for row in rows)):
+        raise exc.FileFormatError(_('The manifest must contain a list of '
+                                    'nodes.'))
+    return rows
+
+
+def _bulk_node_params(args):
+    '''Return the creation parameters of the nodes of node-create-bulk.'''
+    if bool(args.count) == bool(args.manifest):
+        raise exc.CommandError(_('Either --count or --manifest must be '
+                                 'specified.'))
+    if args.count:
+        rows = [{} for i in range(args.count)]
+    else:
+        rows = _load_node_manifest(args.manifest)
+
+    nodes = []
+    for index, row in enumerate(rows, 1):
+        tags = row.get('tags')
+        if tags and isinstance(tags, six.string_types):
+            tags = utils.format_parameters([tags])
+        params = {
+            'name': (row.get('name') or
+                     '%s-%d' % (args.name_prefix, index)),
+            'profile_id': (row.get('profile') or row.get('profile_id') or
+                           args.profile),
+            'cluster_id': (row.get('cluster') or row.get('cluster_id') or
+                           args.cluster),
+            'role': row.get('role') or args.role,
+            'tags': tags or utils.format_parameters(args.tags),
+        }
+        if not params['profile_id']:
+            msg = _('No profile specified for node %s.') % params['name']
+            raise exc.CommandError(msg)
+        nodes.append(params)
+    return nodes
+
+
+@utils.arg('-n', '--count', metavar='<COUNT>', type=int,
+           help=_('Number of nodes to create, named after --name-prefix.'))
+@utils.arg('-m', '--manifest', metavar='<FILE>',
+           help=_('YAML or CSV (.csv) file listing the nodes to create, '
+                  'with their name and optionally profile, cluster, role '
+                  'and tags. Values missing from the file are taken from '
+                  'the options.'))
+@utils.arg('-P', '--name-prefix', metavar='<PREFIX>', default='node',
+           help=_('Prefix of the names of nodes with no name given, '
+                  'followed by the index of the node. Default to "node".'))
+@utils.arg('-p', '--profile', metavar='<PROFILE>',
+           help=_('Profile Id used for the nodes.'))
+@utils.arg('-c', '--cluster', metavar='<CLUSTER>',
+           help=_('Cluster Id for the nodes.'))
+@utils.arg('-r', '--role', metavar='<ROLE>',
+           help=_('Role for the nodes in the specific cluster.'))
+@utils.arg('-g', '--tags', metavar='<KEY1=VALUE1;KEY2=VALUE2...>',
+           help=_('Tag values to be attached to the nodes. '
+                  'This can be specified multiple times, or once with tags '
+                  'separated by a semicolon.'),
+           action='append')
+@utils.arg('--parallel', metavar='<N>', type=int, default=10,
+           help=_('Number of creation requests to send concurrently. '
+                  'Default to 10.'))
+@utils.arg('--rate', metavar='<N>', type=float,
+           help=_('Maximum number of creation requests sent per second. '
+                  'Default to no limit.'))
+@utils.arg('--format', metavar='<FORMAT>', default='table',
+           choices=utils.list_formats,
+           help=_('Output format of the results, one of: %s. Default to '
+                  'table.') % ', '.join(utils.list_formats))
+def do_node_create_bulk(sc, args):
+    '''Create many nodes at once.'''
+    nodes = _bulk_node_params(args)
+
+    def _create(params):
+        try:
+            node = sc.create(models.Node, params)
+        except Exception as ex:
+            # Whatever the error, report it for this node only so that the
+            # nodes already created are still reported
+            return BulkNodeResult(params['name'], None, six.text_type(ex))
+        if node is None:
+            return BulkNodeResult(params['name'], None, _('Unknown error'))
+        return BulkNodeResult(params['name'], node.id, None)
+
+    results = utils.parallel_map(_create, nodes, args.parallel,
+                                 rate=args.rate)
+    formatters = {
+        'id': lambda r: r.id or '',
+        'error': lambda r: r.error or '',
+    }
+    utils.print_list(results, ['name', 'id', 'error'], formatters=formatters,
+                     sortby_index=None, output_format=args.format)
+
+    failed = len([r for r in results if r.error])
+    if failed:
+        # Not printed with the results, which may be parsed
+        msg = _('%(failed)s of %(total)s node creation(s) failed.') % {
+            'failed': failed, 'total': len(results)}
+        sys.stderr.write(msg + '\n')
+    if results and failed == len(results):
+        raise exc.CommandError(_('Failed to create any of the nodes.'))
+
+
+@_fields_arg
 @utils.arg('id', metavar='<NODE>',
            help=_('Name or ID of the node to show the details for.'))
 def do_node_show(sc, args):
     '''Show detailed info about the specified node.'''
-    _show_node(sc, args.id)
+    _show_node(sc, args.id, fields=_select_fields(args, models.Node))
 
 
+@utils.arg('-i', '--interval', metavar='<SECONDS>', type=float, default=5,
+           help=_('Number of seconds between two checks for changes, at '
+                  'least %s. Default to 5.') % WATCH_MIN_INTERVAL)
+@utils.arg('-c', '--cluster', metavar='<CLUSTER>',
+           help=_('Only watch the nodes of this cluster, given its name or '
+                  'ID.'))
+@utils.arg('id', metavar='<NODE>', nargs='*',
+           help=_('Name or ID of the node(s) to watch. Default to all '
+                  'nodes.'))
+def do_node_watch(sc, args):
+    '''Show nodes, then their changes as they happen.'''
+    queries = {}
+    if args.cluster:
+        queries['cluster_id'] = sc.resolve_id(models.Cluster, args.cluster)
+    ids = None
+    if args.id:
+        ids = set(sc.resolve_id(models.Node, i) for i in args.id)
+    fields = ['name', 'status', 'status_reason', 'cluster_id', 'role']
+    _watch(sc, models.Node, args, fields, ids=ids, **queries)
+
+
+@utils.arg('--parallel', metavar='<N>', type=int, default=1,
+           help=_('Number of deletion requests to send concurrently. '
+                  'Default to 1.'))
 @utils.arg('id', metavar='<NODE>', nargs='+',
            help=_('Name or ID of node(s) to delete.'))
 def do_node_delete(sc, args):
     '''Delete the node(s).'''
-    failure_count = 0
-
-    for nid in args.id:
-        try:
-            query = {'id': nid}
-            sc.delete(models.Node, query)
-        except exc.HTTPNotFound:
-            failure_count += 1
-            print('Node id "%s" not found' % nid)
-    if failure_count == len(args.id):
+    failures = _delete_resources(sc, models.Node, args.id,
+                                 parallel=args.parallel)
+    for nid, ex in failures:
+        print('Node id "%s" not found' % nid)
+    if len(failures) == len(args.id):
         msg = _('Failed to delete any of the specified nodes.')
         raise exc.CommandError(msg)
+    _print_delete_summary(failures, args.id)
     print('Request accepted')
 
 
@@ -994,23 +1408,24 @@ def do_node_delete(sc, args):
 def do_node_update(sc, args):
     '''Update the node.'''
     # Find the node first, we need its UUID 
+    # An ID is resolved without a request, so the update itself can find the
+    # node missing too.
     try:
-        node = sc.get(models.Node, {'id': args.id})
+        node_id = sc.resolve_id(models.Node, args.id)
+        params = {
+            'id': node_id,
+            'name': args.name,
+            'role': args.role,
+            'profile': args.profile,
+            'tags': utils.format_parameters(args.tags),
+        }
+        sc.update(models.Node, params)
     except exc.HTTPNotFound:
         raise exc.CommandError(_('Node not found: %s') % args.id)
-
-    params = {
-        'id': node.id,
-        'name': args.name,
-        'role': args.role,
-        'profile': args.profile,
-        'tags': utils.format_parameters(args.tags),
-    }
-
-    sc.update(models.Node, params)
-    _show_node(sc, node.id)
+    _show_node(sc, node_id)
 
 
+@_wait_args
 @utils.arg('-c', '--cluster', required=True,
            help=_('ID or name of cluster for node to join.'))
 @utils.arg('id', metavar='<NODE>',
@@ -1025,10 +1440,11 @@ def do_node_join(sc, args):
         }
     }
     resp = sc.action(models.Node, params)
-    print('Request accepted by action %s' % resp['action'])
+    _handle_action(sc, args, resp['action'])
     _show_node(sc, args.id)
 
 
+@_wait_args
 @utils.arg('id', metavar='<NODE>',
            help=_('Name or ID of node to operate on.'))
 def do_node_leave(sc, args):
@@ -1038,13 +1454,15 @@ def do_node_leave(sc, args):
         'action': 'leave',
     }
     resp = sc.action(models.Node, params)
-    print('Request accepted by action %s' % resp['action'])
+    _handle_action(sc, args, resp['action'])
     _show_node(sc, args.id)
 
 
 ##### EVENTS
 
 
+@_fields_arg
+@_list_args('events')
 @utils.arg('-f', '--filters', metavar='<KEY1=VALUE1;KEY2=VALUE2...>',
            help=_('Filter parameters to apply on returned events. '
                   'This can be specified multiple times, or once with '
@@ -1065,6 +1483,14 @@ def do_node_leave(sc, args):
 @utils.arg('-D', '--show-deleted', default=False, action="store_true",
            help=_('Whether deleted events should be listed as well. '
                   'Default to False.'))
+@utils.arg('--follow', default=False, action="store_true",
+           help=_('Keep printing new events as they are generated, after '
+                  'the last events or the marker if any. The number of last '
+                  'events is given by --limit, default to 10.'))
+@utils.arg('--interval', metavar='<SECONDS>', type=float, default=2,
+           help=_('Number of seconds between two checks for new events with '
+                  '--follow, at least %s. Default to 2.') %
+           WATCH_MIN_INTERVAL)
 def do_event_list(sc, args):
     '''List events.'''
     queries = {
@@ -1077,32 +1503,67 @@ def do_event_list(sc, args):
         'show_deleted': args.show_deleted,
     }
 
+    fields = _select_fields(args, models.Event,
+                            ['id', 'timestamp', 'obj_type', 'obj_id',
+                             'action', 'status', 'status_reason'])
+    if args.follow:
+        try:
+            _follow_events(sc, args, fields, queries)
+        except KeyboardInterrupt:
+            pass
+        return
+
     try:
-        events = sc.list(models.Event, **queries)
+        events = _list(sc, models.Event, args, fields=fields, **queries)
     except exc.HTTPNotFound as ex:
         raise exc.CommandError(str(ex))
 
-    fields = ['id', 'timestamp', 'obj_type', 'obj_id', 'action', 'status',
-              'status_reason']
-    utils.print_list(events, fields, sortby_index=0)
+    utils.print_list(events, fields, sortby_index=0,
+                     output_format=args.format, stream=args.all)
 
 
+def _follow_events(sc, args, fields, queries):
+    for key in ('sort_keys', 'sort_dir', 'limit'):
+        queries.pop(key)
+    marker = queries.pop('marker')
+
+    recent = []
+    if marker is None:
+        recent = sc.list_page(models.Event, limit=args.limit or 10,
+                              sort_keys='timestamp', sort_dir='desc',
+                              fields=fields, **queries) or []
+        recent.reverse()
+        if recent:
+            marker = recent[-1].id
+
+    interval = max(args.interval, WATCH_MIN_INTERVAL)
+    events = itertools.chain(recent, [None],
+                             sc.follow(models.Event, interval=interval,
+                                       marker=marker, fields=fields,
+                                       **queries))
+    utils.print_list(events, fields, output_format=args.format, stream=True)
+
+
+@_fields_arg
 @utils.arg('event', metavar='<EVENT>',
            help=_('ID of event to display details for.'))
 def do_event_show(sc, args):
     '''Describe the event.'''
+    fields = _select_fields(args, models.Event)
     try:
         query = {'id': args.event}
-        event = sc.get(models.Event, query)
+        event = sc.get(models.Event, query, fields=fields)
     except exc.HTTPNotFound as ex:
         raise exc.CommandError(str(ex))
 
-    utils.print_dict(event.to_dict())
+    utils.print_dict(_prune(event.to_dict(), fields))
 
 
 #### ACTIONS
 
 
+@_fields_arg
+@_list_args('actions')
 @utils.arg('-f', '--filters', metavar='<KEY1=VALUE1;KEY2=VALUE2...>',
            help=_('Filter parameters to apply on returned actions. '
                   'This can be specified multiple times, or once with '
@@ -1137,12 +1598,12 @@ def do_action_list(sc, args):
         'marker': args.marker,
     }
 
-    actions = sc.list(models.Action, **queries)
-
-    fields = ['id', 'name', 'action', 'status', 'target', 'depends_on',
-              'depended_by']
+    fields = _select_fields(args, models.Action,
+                            ['id', 'name', 'action', 'status', 'target',
+                             'depends_on', 'depended_by'])
+    actions = _list(sc, models.Action, args, fields=fields, **queries)
 
-    if not args.full_id:
+    if not _full_id(args):
         formatters = {
             'id': _short_id,
             'target': _short_target,
@@ -1150,16 +1611,19 @@ def do_action_list(sc, args):
     else:
         formatters = {}
 
-    utils.print_list(actions, fields, formatters=formatters, sortby_index=0)
+    utils.print_list(actions, fields, formatters=formatters, sortby_index=0,
+                     output_format=args.format, stream=args.all)
 
 
+@_fields_arg
 @utils.arg('id', metavar='<ACTION>',
            help=_('Name or ID of the action to show the details for.'))
 def do_action_show(sc, args):
     '''Show detailed info about the specified action.'''
+    fields = _select_fields(args, models.Action)
     try:
         query = {'id': args.id}
-        action = sc.get(models.Action, query)
+        action = sc.get(models.Action, query, fields=fields)
     except exc.HTTPNotFound:
         msg = _('Action %(id)s is not found') % args.id
         raise exc.CommandError(msg)
@@ -1171,4 +1635,26 @@ def do_action_show(sc, args):
         'data': utils.json_formatter,
     }
 
-    utils.print_dict(action.to_dict(), formatters=formatters)
+    utils.print_dict(_prune(action.to_dict(), fields), formatters=formatters)
+
+
+@utils.arg('-t', '--timeout', metavar='<SECONDS>', type=float,
+           help=_('Maximum number of seconds to wait. Default to wait '
+                  'forever.'))
+@utils.arg('id', metavar='<ACTION>', nargs='+',
+           help=_('ID of the action(s) to wait for.'))
+def do_action_wait(sc, args):
+    '''Wait for the specified actions to complete.'''
+    failed = 0
+    try:
+        for action in sc.wait_for_actions(args.id, timeout=args.timeout):
+            _print_action_result(action)
+            if action.status != 'SUCCEEDED':
+                failed += 1
+    except exc.ActionTimeout as ex:
+        raise exc.CommandError(six.text_type(ex))
+
+    if failed:
+        msg = _('%(failed)s of %(total)s actions did not succeed') % {
+            'failed': failed, 'total': len(set(args.id))}
+        raise exc.CommandError(msg)
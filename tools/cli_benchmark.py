@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+'''
+Time the phases of 'senlin node-list' against a local fake server.
+
+Usage: python tools/cli_benchmark.py [--rows 10,1000,100000] [--repeat N]
+                                     [--output FILE] [--baseline FILE]
+
+The phases are the ones of SenlinShell.main: interpreter startup, argument
+parsing, identity argument checks, connection and authentication, the list
+requests, model construction and rendering. Parsing is also timed with the
+parsers of all the commands built, as done before only the one of the
+command run was. The memory held by the models,
+full SDK resources or compact records, is also measured with tracemalloc
+when available. Results can be saved as JSON and compared with a previous
+run to spot regressions.
+'''
+
+from __future__ import print_function
+
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2, memory is not measured
+    tracemalloc = None
+
+import fake_senlin_server
+
+from senlinclient import cliargs
+from senlinclient.common import sdk
+from senlinclient.common import serialization
+from senlinclient.common import utils
+from senlinclient import shell
+from senlinclient.v1 import models
+
+PHASES = ('startup', 'parse', 'parse_full', 'check_identity', 'connect',
+          'request', 'models_full', 'models_compact', 'render_table',
+          'render_stream')
+
+#: Bytes held by the models built from the listed nodes
+MEMORY_PHASES = ('memory_full', 'memory_compact')
+
+FIELDS = ['id', 'name', 'status', 'cluster_id', 'physical_id',
+          'profile_name', 'created_time', 'updated_time']
+
+
+@contextlib.contextmanager
+def _quiet():
+    '''Send whatever is printed to the null device.'''
+    stdout = sys.stdout
+    with open(os.devnull, 'w') as devnull:
+        sys.stdout = devnull
+        try:
+            yield
+        finally:
+            sys.stdout = stdout
+
+
+class Timer(object):
+    '''Record the wall time of named blocks.'''
+
+    def __init__(self):
+        self.times = {}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = timeit.default_timer()
+        try:
+            yield
+        finally:
+            self.times[name] = timeit.default_timer() - start
+
+
+def time_startup():
+    '''Time the start of an interpreter importing the shell module.'''
+    start = timeit.default_timer()
+    subprocess.check_call([sys.executable, '-c',
+                           'import senlinclient.shell'])
+    return timeit.default_timer() - start
+
+
+def build_full(data):
+    return [models.Node.existing(**d) for d in data]
+
+
+def build_compact(data):
+    record, specs = models.Node.compact_record(FIELDS)
+    return [record._make(d[k] if k in d else d.get(a, df)
+                         for k, a, df in specs)
+            for d in data]
+
+
+def measure_memory(build, data):
+    '''Return the number of bytes held by the objects built from data.'''
+    tracemalloc.start()
+    try:
+        objs = build(data)
+        held = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del objs
+    return held
+
+
+def run_once(url, page_size):
+    '''Run node-list step by step, returning the time of each phase.'''
+    timer = Timer()
+    argv = ['--os-auth-url', url + '/v3', '--os-user-id', 'demo',
+            '--os-password', 'demo', '--os-project-id',
+            fake_senlin_server.PROJECT_ID, 'node-list']
+
+    with timer.phase('parse'):
+        senlin_shell = shell.SenlinShell()
+        parser = argparse.ArgumentParser(prog='senlin', add_help=False)
+        cliargs.add_global_args(parser, version='benchmark')
+        cliargs.add_global_identity_args(parser)
+        options, _args = parser.parse_known_args(argv)
+        subparser = senlin_shell.get_subcommand_parser(
+            parser, options.senlin_api_version, 'node-list')
+        args = subparser.parse_args(argv)
+
+    # What parsing cost when the parsers of all commands were built
+    with timer.phase('parse_full'):
+        full_parser = argparse.ArgumentParser(prog='senlin', add_help=False)
+        cliargs.add_global_args(full_parser, version='benchmark')
+        cliargs.add_global_identity_args(full_parser)
+        shell.SenlinShell().get_subcommand_parser(
+            full_parser, options.senlin_api_version).parse_args(argv)
+
+    with timer.phase('check_identity'), _quiet():
+        senlin_shell._check_identity_arguments(args)
+
+    with timer.phase('connect'):
+        conn = sdk.create_connection(args.user_preferences, shell.USER_AGENT,
+                                     auth_url=args.auth_url,
+                                     user_id=args.user_id,
+                                     password=args.password,
+                                     project_id=args.project_id)
+        sdk.get_access_info(conn)
+
+    with timer.phase('request'):
+        data = []
+        params = {'limit': page_size}
+        while True:
+            page = sdk.get_json(conn.session, models.Node.base_path,
+                                service=models.Node.service,
+                                params=params)[models.Node.resources_key]
+            if not page:
+                break
+            data.extend(page)
+            params['marker'] = page[-1]['id']
+
+    with timer.phase('models_full'):
+        nodes = build_full(data)
+
+    with timer.phase('models_compact'):
+        build_compact(data)
+
+    formatters = {
+        'id': lambda o: o.id[:8] + ' ...',
+        'cluster_id': lambda o: o.cluster_id[:8] + ' ...',
+        'physical_id': lambda o: o.physical_id[:8] + ' ...',
+    }
+    with timer.phase('render_table'), _quiet():
+        utils.print_list(nodes, FIELDS, formatters=formatters,
+                         sortby_index=6)
+
+    with timer.phase('render_stream'), _quiet():
+        utils.print_list(nodes, FIELDS, formatters=formatters, stream=True)
+
+    if tracemalloc is not None:
+        timer.times['memory_full'] = measure_memory(build_full, data)
+        timer.times['memory_compact'] = measure_memory(build_compact, data)
+    return timer.times
+
+
+def _format(name, value):
+    if name in MEMORY_PHASES:
+        return '%8.2fMB' % (value / 1048576.0)
+    return '%9.4fs' % value
+
+
+def run(rows, repeat, page_size):
+    '''Benchmark a number of rows, returning statistics per phase.'''
+    data = fake_senlin_server.DataSet(nodes=rows, actions=0, events=0)
+    server = fake_senlin_server.FakeSenlinServer(('127.0.0.1', 0), data,
+                                                 page_size=page_size)
+    server.start()
+    samples = dict((name, []) for name in PHASES + MEMORY_PHASES)
+    try:
+        for i in range(repeat):
+            samples['startup'].append(time_startup())
+            for name, value in run_once(server.url, page_size).items():
+                samples[name].append(value)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    results = {}
+    for name, values in samples.items():
+        if not values:
+            continue
+        values.sort()
+        results[name] = {'min': values[0], 'max': values[-1],
+                         'median': values[len(values) // 2]}
+    return results
+
+
+def compare(results, baseline, threshold):
+    '''Print the phases worse than in the baseline, return their number.'''
+    regressions = 0
+    for rows, phases in sorted(results.items(), key=lambda r: int(r[0])):
+        for name in PHASES + MEMORY_PHASES:
+            old = baseline.get(rows, {}).get(name)
+            if not old or not old['min'] or name not in phases:
+                continue
+            ratio = float(phases[name]['min']) / old['min']
+            if ratio > threshold:
+                regressions += 1
+                print('REGRESSION rows=%s %s: %s -> %s (x%.2f)' % (
+                    rows, name, _format(name, old['min']).strip(),
+                    _format(name, phases[name]['min']).strip(), ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', default='10,1000,100000',
+                        help='Comma separated numbers of nodes to list.')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of runs per number of nodes.')
+    parser.add_argument('--page-size', type=int, default=1000,
+                        help='Number of nodes per list request.')
+    parser.add_argument('--output', metavar='FILE',
+                        help='Save the results as JSON to this file.')
+    parser.add_argument('--baseline', metavar='FILE',
+                        help='Results of a previous run to compare with.')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='Ratio of time or memory over the baseline '
+                             'reported as a regression.')
+    args = parser.parse_args()
+
+    results = {}
+    for rows in [int(r) for r in args.rows.split(',')]:
+        results[str(rows)] = phases = run(rows, args.repeat, args.page_size)
+        print('%d rows' % rows)
+        for name in PHASES + MEMORY_PHASES:
+            if name in phases:
+                print('  %-16s min %s  median %s' % (
+                    name, _format(name, phases[name]['min']),
+                    _format(name, phases[name]['median'])))
+
+    if args.output:
+        report = {
+            'date': datetime.datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'json_backend': serialization.get_backend(),
+            'repeat': args.repeat,
+            'page_size': args.page_size,
+            'results': results,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,504 @@
+#!/usr/bin/env python
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+'''
+A fake Senlin and Keystone v3 server for offline testing and benchmarking.
+
+The server keeps a generated data set in memory and implements enough of
+both APIs for the CLI: token creation, list/show/create/update/delete of
+clusters, nodes, profiles and policies, cluster and node actions, and the
+action, event and build info queries. Data is the same from run to run.
+
+Example::
+
+    python tools/fake_senlin_server.py --port 8778 --nodes 100000 &
+    senlin --os-auth-url http://127.0.0.1:8778/v3 --os-username demo \\
+        --os-password demo --os-project-name demo node-list
+'''
+
+from __future__ import print_function
+
+import argparse
+import datetime
+import hashlib
+import itertools
+import json
+import threading
+import time
+import uuid
+
+import six
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+from six.moves.urllib import parse
+
+#: Collections served, with the key of their objects in single replies
+COLLECTIONS = {
+    'profiles': 'profile',
+    'policies': 'policy',
+    'clusters': 'cluster',
+    'nodes': 'node',
+    'actions': None,
+    'events': None,
+}
+
+#: Query parameters that are not filters
+RESERVED_PARAMS = ('limit', 'marker', 'sort_keys', 'sort_dir', 'filters',
+                   'show_deleted', 'show_nested', 'global_tenant', 'fields')
+
+PROJECT_ID = uuid.UUID(int=1).hex
+USER_ID = uuid.UUID(int=2).hex
+EPOCH = datetime.datetime(2015, 3, 5)
+
+
+def _timestamp(seconds):
+    return (EPOCH + datetime.timedelta(seconds=seconds)).isoformat()
+
+
+def _now():
+    return datetime.datetime.utcnow().replace(microsecond=0).isoformat()
+
+
+def _uuid(kind, index):
+    digest = hashlib.md5(('%d-%d' % (kind, index)).encode('ascii')).digest()
+    return str(uuid.UUID(bytes=digest, version=4))
+
+
+class DataSet(object):
+    '''The objects served, generated in a deterministic way.'''
+
+    def __init__(self, profiles=10, policies=10, clusters=10, nodes=100,
+                 actions=100, events=100, action_duration=0):
+        self.action_duration = action_duration
+        self.lock = threading.Lock()
+        self.objects = dict((name, []) for name in COLLECTIONS)
+        self.by_id = dict((name, {}) for name in COLLECTIONS)
+        # Sorted copies of the collections with the position of each ID,
+        # by collection, sort keys and direction
+        self._orders = {}
+
+        for i in range(profiles):
+            self.add('profiles', {
+                'id': _uuid(1, i), 'name': 'profile-%d' % i,
+                'type': 'os.nova.server', 'permission': '',
+                'spec': {'flavor': 'm1.small', 'image': 'cirros',
+                         'name': 'server-%d' % i},
+                'tags': {}, 'created_time': _timestamp(i),
+                'updated_time': None, 'deleted_time': None,
+            })
+        for i in range(policies):
+            self.add('policies', {
+                'id': _uuid(2, i), 'name': 'policy-%d' % i,
+                'type': 'ScalingPolicy', 'level': 50, 'cooldown': 60,
+                'spec': {'adjustment_type': 'CHANGE_IN_CAPACITY',
+                         'adjustment_number': 1},
+                'data': {}, 'created_time': _timestamp(i),
+                'updated_time': None, 'deleted_time': None,
+            })
+        for i in range(clusters):
+            self.add('clusters', {
+                'id': _uuid(3, i), 'name': 'cluster-%d' % i,
+                'profile_id': _uuid(1, i % max(profiles, 1)),
+                'profile_name': 'profile-%d' % (i % max(profiles, 1)),
+                'user': USER_ID, 'project': PROJECT_ID, 'domain': None,
+                'parent': None, 'init_time': _timestamp(i),
+                'created_time': _timestamp(i), 'updated_time': None,
+                'deleted_time': None, 'size': 0, 'timeout': 3600,
+                'status': 'ACTIVE', 'status_reason': 'Cluster creation '
+                'succeeded', 'tags': {}, 'data': {}, 'nodes': [],
+            })
+        for i in range(nodes):
+            cluster = self.objects['clusters'][i % clusters] \
+                if clusters else None
+            node = {
+                'id': _uuid(4, i), 'name': 'node-%d' % i,
+                'physical_id': _uuid(9, i),
+                'cluster_id': cluster['id'] if cluster else None,
+                'profile_id': _uuid(1, i % max(profiles, 1)),
+                'profile_name': 'profile-%d' % (i % max(profiles, 1)),
+                'project': PROJECT_ID, 'index': i, 'role': None,
+                'init_time': _timestamp(i), 'created_time': _timestamp(i),
+                'updated_time': None, 'deleted_time': None,
+                'status': 'ACTIVE', 'status_reason': 'Creation succeeded',
+                'tags': {}, 'data': {'placement': {'zone': 'nova'}},
+            }
+            if cluster:
+                cluster['nodes'].append(node['id'])
+                cluster['size'] += 1
+            self.add('nodes', node)
+        for i in range(actions):
+            self.add('actions', {
+                'id': _uuid(5, i), 'name': 'node_create_%d' % i,
+                'target': _uuid(4, i), 'action': 'NODE_CREATE',
+                'cause': 'RPC Request', 'owner': None, 'interval': -1,
+                'start_time': float(i), 'end_time': float(i + 1),
+                'timeout': 3600, 'status': 'SUCCEEDED',
+                'status_reason': 'Action completed', 'inputs': {},
+                'outputs': {}, 'depends_on': [], 'depended_by': [],
+                'created_time': _timestamp(i), 'updated_time': None,
+            })
+        for i in range(events):
+            self.add('events', {
+                'id': _uuid(6, i), 'timestamp': _timestamp(i),
+                'obj_id': _uuid(4, i), 'obj_name': 'node-%d' % i,
+                'obj_type': 'NODE', 'cluster_id': None, 'level': 20,
+                'user': USER_ID, 'project': PROJECT_ID,
+                'action': 'CREATE', 'status': 'ACTIVE',
+                'status_reason': 'Node created',
+            })
+
+    def add(self, collection, obj):
+        self.objects[collection].append(obj)
+        self.by_id[collection][obj['id']] = obj
+        self.changed(collection)
+
+    def changed(self, collection):
+        '''Forget the sort orders of a modified collection.'''
+        for key in [k for k in self._orders if k[0] == collection]:
+            del self._orders[key]
+
+    def ordered(self, collection, sort_keys, reverse=False):
+        '''Return a sorted collection and the position of each ID in it.'''
+        key = (collection, tuple(sort_keys), reverse)
+        if key not in self._orders:
+            # None values sort first in ascending order, last in descending
+            objs = sorted(self.objects[collection], reverse=reverse,
+                          key=lambda o: [(o.get(k) is not None, o.get(k) or '')
+                                         for k in sort_keys] + [o['id']])
+            positions = dict((o['id'], i) for i, o in enumerate(objs))
+            self._orders[key] = (objs, positions)
+        return self._orders[key]
+
+    def find(self, collection, name_or_id):
+        obj = self.by_id[collection].get(name_or_id)
+        if obj is None:
+            for candidate in self.objects[collection]:
+                if candidate.get('name') == name_or_id:
+                    return candidate
+        return obj
+
+    def remove(self, collection, obj):
+        self.objects[collection].remove(obj)
+        del self.by_id[collection][obj['id']]
+        self.changed(collection)
+
+    def start_action(self, target, name):
+        '''Record an action on a target, completed after the duration.'''
+        now = time.time()
+        action = {
+            'id': str(uuid.uuid4()), 'name': name, 'target': target,
+            'action': name.upper(), 'cause': 'RPC Request', 'owner': None,
+            'interval': -1, 'start_time': now,
+            'end_time': now + self.action_duration, 'timeout': 3600,
+            'status': 'RUNNING', 'status_reason': 'Action running',
+            'inputs': {}, 'outputs': {}, 'depends_on': [],
+            'depended_by': [], 'created_time': _now(),
+            'updated_time': None,
+        }
+        self.add('actions', action)
+        self.add('events', {
+            'id': str(uuid.uuid4()), 'timestamp': _now(),
+            'obj_id': target, 'obj_name': None, 'obj_type': 'CLUSTER',
+            'cluster_id': None, 'level': 20, 'user': USER_ID,
+            'project': PROJECT_ID, 'action': name.upper(),
+            'status': 'RUNNING', 'status_reason': 'Action started',
+        })
+        return action
+
+    def refresh(self, obj):
+        '''Complete an action once its end time has passed.'''
+        if (obj.get('status') == 'RUNNING' and 'end_time' in obj and
+                obj['end_time'] <= time.time()):
+            obj['status'] = 'SUCCEEDED'
+            obj['status_reason'] = 'Action completed'
+            obj['updated_time'] = _now()
+            self.changed('actions')
+        return obj
+
+
+class FakeSenlinHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    '''Request handler serving the data set of its server.'''
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, don't let small replies wait
+    # for the client to acknowledge the headers
+    disable_nagle_algorithm = True
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            BaseHTTPServer.BaseHTTPRequestHandler.log_message(self, fmt,
+                                                              *args)
+
+    def _reply(self, status, body=None, headers=None):
+        data = b'' if body is None else json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        if body is not None:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status, message, title='Error'):
+        self._reply(status, {
+            'code': status, 'title': title,
+            'error': {'code': status, 'message': message, 'type': title},
+        })
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length).decode('utf-8'))
+
+    def _dispatch(self, method):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        url = parse.urlparse(self.path)
+        parts = [p for p in url.path.split('/') if p]
+        params = parse.parse_qs(url.query, keep_blank_values=True)
+        if parts[:1] == ['v3']:
+            return self._identity(method, parts[1:])
+        if parts[:1] != ['v1']:
+            return self._error(404, 'Unknown path %s' % url.path,
+                               'NotFound')
+        if not self.headers.get('X-Auth-Token'):
+            return self._error(401, 'Authentication required',
+                               'Unauthorized')
+
+        with self.server.data.lock:
+            return self._clustering(method, parts[1:], params)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PUT(self):
+        self._dispatch('PUT')
+
+    def do_PATCH(self):
+        self._dispatch('PATCH')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def _identity(self, method, parts):
+        base = 'http://%s:%s' % self.server.server_address[:2]
+        if method == 'GET' and not parts:
+            return self._reply(200, {'version': {
+                'id': 'v3.0', 'status': 'stable',
+                'links': [{'rel': 'self', 'href': base + '/v3/'}]}})
+        if method != 'POST' or parts != ['auth', 'tokens']:
+            return self._error(404, 'Unknown identity request', 'NotFound')
+
+        self._body()
+        token = {
+            'methods': ['password'],
+            'expires_at': '2099-01-01T00:00:00.000000Z',
+            'issued_at': _now() + '.000000Z',
+            'user': {'id': USER_ID, 'name': 'demo',
+                     'domain': {'id': 'default', 'name': 'Default'}},
+            'project': {'id': PROJECT_ID, 'name': 'demo',
+                        'domain': {'id': 'default', 'name': 'Default'}},
+            'catalog': [{
+                'type': 'clustering', 'name': 'senlin', 'id': 'senlin',
+                'endpoints': [{'interface': interface, 'id': interface,
+                               'region': 'RegionOne', 'url': base + '/v1'}
+                              for interface in ('public', 'internal',
+                                                'admin')],
+            }],
+        }
+        self._reply(201, {'token': token},
+                    headers={'X-Subject-Token': uuid.uuid4().hex})
+
+    def _clustering(self, method, parts, params):
+        data = self.server.data
+        if parts == ['build_info'] and method == 'GET':
+            return self._reply(200, {'api': {'revision': '1.0'},
+                                     'engine': {'revision': '1.0'}})
+        if not parts or parts[0] not in COLLECTIONS:
+            return self._error(404, 'Unknown collection', 'NotFound')
+
+        collection = parts[0]
+        key = COLLECTIONS[collection]
+        if len(parts) == 1:
+            if method == 'GET':
+                return self._list(collection, params)
+            if method == 'POST' and key:
+                return self._create(collection, key, self._body())
+            return self._error(405, 'Method not allowed', 'NotAllowed')
+
+        obj = data.find(collection, parse.unquote(parts[1]))
+        if obj is None:
+            return self._error(404, 'The %s (%s) could not be found.' %
+                               (key or collection[:-1], parts[1]),
+                               'NotFound')
+        if len(parts) == 3 and parts[2] == 'action' and method == 'PUT':
+            name = list(self._body().keys() or ['action'])[0]
+            action = data.start_action(obj['id'], name)
+            return self._reply(202, {'action': action['id']})
+        if len(parts) == 3 and parts[2] == 'policies' and method == 'GET':
+            return self._reply(200, {'cluster_policies': []})
+        if len(parts) != 2:
+            return self._error(404, 'Unknown path', 'NotFound')
+
+        if method == 'GET':
+            return self._show(key, data.refresh(obj), params)
+        if method == 'PATCH':
+            update = self._body().get(key, {})
+            obj.update((k, v) for k, v in update.items()
+                       if v is not None and k != 'id')
+            obj['updated_time'] = _now()
+            data.changed(collection)
+            return self._reply(200, {key: obj})
+        if method == 'DELETE':
+            data.remove(collection, obj)
+            return self._reply(204)
+        return self._error(405, 'Method not allowed', 'NotAllowed')
+
+    def _project(self, obj, params):
+        fields = params.get('fields')
+        if not fields:
+            return obj
+        names = set(','.join(fields).split(',')) | set(['id'])
+        return dict((k, v) for k, v in obj.items() if k in names)
+
+    def _show(self, key, obj, params):
+        obj = self._project(obj, params)
+        text = json.dumps(obj, sort_keys=True).encode('utf-8')
+        etag = '"%s"' % hashlib.md5(text).hexdigest()
+        if self.headers.get('If-None-Match') == etag:
+            return self._reply(304, headers={'ETag': etag})
+        self._reply(200, {key: obj} if key else obj,
+                    headers={'ETag': etag})
+
+    def _list(self, collection, params):
+        data = self.server.data
+        sort_keys = ','.join(params.get('sort_keys', [])).split(',')
+        default_key = 'timestamp' if collection == 'events' else 'created_time'
+        sort_keys = [k for k in sort_keys if k] or [default_key]
+        reverse = params.get('sort_dir', ['asc'])[0] == 'desc'
+        objs, positions = data.ordered(collection, sort_keys, reverse)
+
+        start = 0
+        marker = params.get('marker', [None])[0]
+        if marker:
+            if marker not in positions:
+                return self._error(400, 'Invalid marker %s' % marker,
+                                   'InvalidParameter')
+            start = positions[marker] + 1
+
+        limit = self.server.page_size
+        if params.get('limit'):
+            limit = min(int(params['limit'][0]), limit)
+        filters = [(name, values) for name, values in params.items()
+                   if name not in RESERVED_PARAMS]
+        page = []
+        for obj in itertools.islice(objs, start, None):
+            if len(page) >= limit:
+                break
+            if all(six.text_type(obj.get(name)) in values
+                   for name, values in filters):
+                page.append(obj)
+        page = [self._project(data.refresh(o), params) for o in page]
+        self._reply(200, {collection: page})
+
+    def _create(self, collection, key, body):
+        attrs = dict(body.get(key, {}))
+        attrs.update(id=str(uuid.uuid4()), created_time=_now(),
+                     updated_time=None, deleted_time=None,
+                     project=PROJECT_ID)
+        if collection in ('clusters', 'nodes'):
+            attrs.setdefault('status', 'ACTIVE')
+            attrs.setdefault('status_reason', 'Creation succeeded')
+            attrs.setdefault('data', {})
+        if collection == 'nodes':
+            attrs.setdefault('physical_id', str(uuid.uuid4()))
+            attrs.setdefault('index', len(self.server.data.objects['nodes']))
+        self.server.data.add(collection, attrs)
+        if collection in ('clusters', 'nodes'):
+            self.server.data.start_action(attrs['id'], key + '_create')
+        self._reply(202, {key: attrs})
+
+
+class FakeSenlinServer(socketserver.ThreadingMixIn,
+                       BaseHTTPServer.HTTPServer):
+    '''A threaded HTTP server for a data set.
+
+    :param latency: Seconds to wait before handling each request.
+    :param page_size: Maximum number of objects returned by list requests.
+    '''
+    daemon_threads = True
+
+    def __init__(self, address, data, latency=0, page_size=1000,
+                 verbose=False):
+        BaseHTTPServer.HTTPServer.__init__(self, address, FakeSenlinHandler)
+        self.data = data
+        self.latency = latency
+        self.page_size = page_size
+        self.verbose = verbose
+
+    @property
+    def url(self):
+        return 'http://%s:%s' % self.server_address[:2]
+
+    def start(self):
+        '''Serve requests from a background thread.'''
+        thread = threading.Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8778,
+                        help='Port to listen on, 0 picks a free one.')
+    parser.add_argument('--latency', type=float, default=0,
+                        help='Milliseconds to wait before each reply.')
+    parser.add_argument('--page-size', type=int, default=1000,
+                        help='Maximum number of objects in a list reply.')
+    parser.add_argument('--action-duration', type=float, default=0,
+                        help='Seconds before new actions succeed.')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='Log requests.')
+    for name, default in (('profiles', 10), ('policies', 10),
+                          ('clusters', 10), ('nodes', 100),
+                          ('actions', 100), ('events', 100)):
+        parser.add_argument('--%s' % name, type=int, default=default,
+                            help='Number of %s generated.' % name)
+    args = parser.parse_args()
+
+    data = DataSet(profiles=args.profiles, policies=args.policies,
+                   clusters=args.clusters, nodes=args.nodes,
+                   actions=args.actions, events=args.events,
+                   action_duration=args.action_duration)
+    server = FakeSenlinServer((args.host, args.port), data,
+                              latency=args.latency / 1000.0,
+                              page_size=args.page_size,
+                              verbose=args.verbose)
+    print('Serving on %s, auth URL %s/v3' % (server.url, server.url))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+'''
+Compare the JSON backends of senlinclient on typical API payloads.
+
+Usage: python tools/json_benchmark.py [--rows N] [--repeat N]
+'''
+
+from __future__ import print_function
+
+import argparse
+import timeit
+import uuid
+
+from oslo_utils import importutils
+
+from senlinclient.common import serialization
+
+
+def _time(i):
+    return '2015-03-05T10:%02d:%02d' % (i // 60 % 60, i % 60)
+
+
+def cluster(i):
+    return {
+        'id': str(uuid.uuid4()), 'name': 'cluster-%d' % i,
+        'profile_id': str(uuid.uuid4()), 'profile_name': 'web-server',
+        'user': uuid.uuid4().hex, 'project': uuid.uuid4().hex,
+        'domain': None, 'parent': None, 'init_time': _time(i),
+        'created_time': _time(i), 'updated_time': _time(i + 1),
+        'deleted_time': None, 'size': 3, 'timeout': 3600,
+        'status': 'ACTIVE', 'status_reason': 'Cluster creation succeeded',
+        'tags': {'env': 'prod', 'team': 'web'}, 'data': {},
+        'nodes': [str(uuid.uuid4()) for _ in range(3)],
+    }
+
+
+def node(i):
+    return {
+        'id': str(uuid.uuid4()), 'name': 'node-%d' % i,
+        'physical_id': str(uuid.uuid4()), 'cluster_id': str(uuid.uuid4()),
+        'profile_id': str(uuid.uuid4()), 'profile_name': 'web-server',
+        'project': uuid.uuid4().hex, 'index': i, 'role': None,
+        'init_time': _time(i), 'created_time': _time(i),
+        'updated_time': None, 'deleted_time': None, 'status': 'ACTIVE',
+        'status_reason': 'Creation succeeded', 'tags': {},
+        'data': {'placement': {'zone': 'nova', 'host': 'compute-%d' % i}},
+    }
+
+
+def event(i):
+    return {
+        'id': str(uuid.uuid4()), 'timestamp': _time(i),
+        'obj_id': str(uuid.uuid4()), 'obj_name': 'node-%d' % i,
+        'obj_type': 'NODE', 'cluster_id': str(uuid.uuid4()),
+        'level': 20, 'user': uuid.uuid4().hex, 'project': uuid.uuid4().hex,
+        'action': 'CREATE', 'status': 'ACTIVE',
+        'status_reason': 'Node created',
+    }
+
+
+PAYLOADS = (('clusters', cluster), ('nodes', node), ('events', event))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=1000,
+                        help='Number of objects per payload.')
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='Number of runs of each operation.')
+    args = parser.parse_args()
+
+    backends = [b for b in serialization.BACKENDS
+                if b == 'json' or importutils.try_import(b)]
+    print('%-10s %-8s %10s %10s' % ('payload', 'backend', 'loads ms',
+                                    'dumps ms'))
+    for key, make in PAYLOADS:
+        doc = {key: [make(i) for i in range(args.rows)]}
+        for backend in backends:
+            serialization.set_backend(backend)
+            text = serialization.dumps(doc)
+            data = text.encode('utf-8')
+            loads = timeit.timeit(lambda: serialization.loads(data),
+                                  number=args.repeat)
+            dumps = timeit.timeit(lambda: serialization.dumps(doc, indent=2),
+                                  number=args.repeat)
+            print('%-10s %-8s %10.2f %10.2f' % (
+                key, backend, loads * 1000 / args.repeat,
+                dumps * 1000 / args.repeat))
+
+
+if __name__ == '__main__':
+    main()